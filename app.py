@@ -2,8 +2,11 @@ from flask import Flask, request, render_template, jsonify, Response
 from backend.servo_actuator import ServoActuator  
 from backend.touch_sensor import SensorCommunication
 import time
+import math
 from backend.camera import get_frames
 from backend.SmartGrasper import SmartGrasper  
+from backend.trajectory import Trajectory, TrajectoryExecutor
+from backend.scheduler import scheduler
 import logging
 
 # 获取 werkzeug logger
@@ -14,6 +17,7 @@ log.setLevel(logging.WARNING)
 actuator = ServoActuator("/dev/ttyUSB0", 921600)
 touch_sensor = SensorCommunication("/dev/ttyACM0", 460800)
 grasping = SmartGrasper(touch_sensor, actuator)
+trajectory_executor = TrajectoryExecutor(actuator, rate=100.0)
 
 app = Flask(__name__)
 
@@ -32,7 +36,8 @@ def index():
 
 @app.route("/grasp_status")
 def grasp_status():
-    grasp_state = {"status": grasping.grasp_state}  # 也可以是 "抓取中" / "完成"
+    grasp_state = {"status": grasping.grasp_state, "metrics": grasping.get_metrics(),
+                   "staleness": grasping.watchdog.report(), "features": grasping.get_features()}  # 也可以是 "抓取中" / "完成"
     return jsonify(grasp_state)
 
 # ----------------------
@@ -43,8 +48,7 @@ def set_dof():
     """设置自由度角度"""
     dof = int(request.args.get("dof"))
     value = int(request.args.get("value"))
-    actuator.set_mode(0, dof)
-    actuator.set_pos_with_vel(value, 800, dof)
+    actuator.set_pos_with_vel(value, 800, dof)  # 设定帧本身从 0x25 开始写，包含模式寄存器
     return f"Set DOF{dof} to {value}"
 
 @app.route("/command", methods=["POST"])
@@ -59,6 +63,8 @@ def command():
         grasping.grasp_state = "等待状态"
     elif cmd == "clear_fault":
         actuator.clear_fault()
+    elif cmd == "pause":
+        actuator.pause_motion()
     else:
         return "Unknown command", 400
     return f"Command executed: {cmd}"
@@ -66,7 +72,7 @@ def command():
 @app.route("/status", methods=["GET"])
 def status():
     """查询关节状态"""
-    status_info = actuator.info
+    status_info = actuator.info  # 同一次轮询的快照视图
     if not status_info:
         return jsonify({"error": "no data"})
     return jsonify({
@@ -75,25 +81,98 @@ def status():
         "DOF3": status_info[3],
         "DOF4": status_info[4],
         "DOF5": status_info[5],
-        "DOF6": status_info[6]
+        "DOF6": status_info[6],
+        "poll": actuator.get_poll_report(),
+        "queue": actuator.get_queue_stats(),
+        "setpoints": actuator.get_setpoint_stats(),
+        "faults": actuator.get_fault_report(),
+        "ages_ms": actuator.get_joint_ages()
     })
 
+@app.route("/servo_config", methods=["GET"])
+def servo_config():
+    """查询各关节配置寄存器（默认走寄存器缓存，?refresh=1 强制从总线读取）"""
+    use_cache = request.args.get("refresh") != "1"
+    return jsonify({
+        "config": actuator.dump_config(use_cache=use_cache),
+        "cache": actuator.get_register_stats()
+    })
+
+@app.route("/trajectory", methods=["GET", "POST"])
+def trajectory():
+    """
+    GET: 轨迹执行统计
+    POST: {"waypoints": [[t, {"1": 位置, ...}], ...], "smooth": true}，从当前位置出发执行轨迹
+    """
+    if request.method == "GET":
+        return jsonify(trajectory_executor.get_stats())
+    data = request.json
+    try:
+        waypoints = [(float(t), {int(i): int(p) for i, p in pose.items()}) for t, pose in data["waypoints"]]
+        plan = Trajectory.from_current(actuator, waypoints, smooth=data.get("smooth", True))
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"status": "error", "msg": str(e)}), 400
+    trajectory_executor.execute(plan)
+    return jsonify({"status": "ok", "duration": plan.duration})
+
+@app.route("/scheduler", methods=["GET"])
+def scheduler_stats():
+    """各周期任务（电缸轮询、触觉扫描、抓取控制）的周期、执行时间、超时和抖动统计"""
+    return jsonify(scheduler.get_stats())
+
 @app.route("/force_data", methods=["GET"])
 def force_data():
     """获取三维力传感器数据"""
     sensors = []
+    snapshot = touch_sensor.get_snapshot()  # 一次完整扫描的数据，无需判断是否填满
+    rates = touch_sensor.get_sample_rates()
+    health = touch_sensor.get_port_health()
+    ages = touch_sensor.get_sensor_ages()
     for i in range(1, 8):  
-        error_code = touch_sensor.error_code[i]
-        if len(touch_sensor.force_data) == 7:
-            force = touch_sensor.force_data.get(i,0)['force']
-            if force is not None:
-                sensor = {"fx": force[0], "fy": force[1], "fz": force[2], "error_code": error_code}
-            else:
-                sensor = {"fx": None, "fy": None, "fz": None, "error_code": error_code}
+        error_code = touch_sensor.sensor_error(i)
+        entry = snapshot.data.get(i)
+        force = entry['force'] if entry else None
+        if force is not None:
+            sensor = {"fx": force[0], "fy": force[1], "fz": force[2], "error_code": error_code}
         else:
             sensor = {"fx": None, "fy": None, "fz": None, "error_code": error_code}
+        sensor["rate_hz"] = rates.get(i, 0.0)
+        sensor["health"] = health.get(i)
+        sensor["age_ms"] = ages.get(i)
+        sensor["stale"] = entry.get("stale", False) if entry else True
         sensors.append(sensor)
-    return jsonify({"sensors": sensors})
+    return jsonify({"sensors": sensors, "seq": snapshot.seq, "links": touch_sensor.get_link_stats()})
+
+@app.route("/taxels", methods=["GET"])
+def taxels():
+    """各传感器最新一帧分布力触点数据（未开启分布力采集时为空）"""
+    now = time.monotonic()
+    result = {}
+    for sensor_id, frame in touch_sensor.get_taxels().items():
+        stamp = frame["timestamp"]
+        result[sensor_id] = {
+            "data": frame["data"].tolist(),
+            "age_ms": None if math.isnan(stamp) else round((now - stamp) * 1000, 1),  # NaN: 尚未采到
+        }
+    return jsonify({"sensors": result})
+
+@app.route("/force_filter", methods=["GET", "POST"])
+def force_filter():
+    """
+    GET: 各传感器三轴力滤波配置
+    POST: {"sensor_id": 1, "kind": "ema", "alpha": 0.3}，kind 可选 mean / ema / median / kalman / none，
+          mean / median 用 "window" 指定窗口，kalman 用 "q" / "r" 指定噪声
+    """
+    if request.method == "POST":
+        data = dict(request.json or {})
+        try:
+            sensor_id = int(data.pop("sensor_id"))
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({"status": "error", "msg": str(e)}), 400
+        params = {k: data[k] for k in ("alpha", "q", "r") if k in data}
+        if not touch_sensor.set_filter(sensor_id, data.get("kind"), data.get("window"), **params):
+            return jsonify({"status": "error", "msg": "滤波设置失败"}), 400
+    return jsonify({"status": "ok", "filters": touch_sensor.get_filter_config()})
 
 @app.route("/video_feed")
 def video_feed():
@@ -108,6 +187,8 @@ def grasp():
     cmd = data.get("cmd")
     if cmd == "start_grasp":
         is_grasping = True
+        if data.get("mode") in ("step", "force"):
+            grasping.mode = data["mode"]
         actuator.clear_fault()
         grasping.start_thread()
         grasping.grasp_state = "抓取中"
@@ -130,12 +211,14 @@ if __name__ == "__main__":
         # 启动硬件线程
         touch_sensor.start_thread()
         actuator.start_thread()
+        trajectory_executor.start_thread()
         time.sleep(2)  # 等待传感器初始化
         # 启动Web服务
         app.run(host="0.0.0.0", port=5000, debug=False)
     except KeyboardInterrupt:
         print("程序终止")
     finally:
+        trajectory_executor.stop_thread()
         actuator.stop_thread()
         touch_sensor.stop_thread()
         actuator.close()
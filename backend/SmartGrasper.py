@@ -3,24 +3,251 @@ from backend.servo_actuator import ServoActuator
 import time
 import math
 import threading
+import logging
+from collections import namedtuple, deque
+import numpy as np
+from backend.force_controller import FingerForceController
+from backend.scheduler import PeriodicTask
+from backend.watchdog import StalenessWatchdog
+from backend.tactile_analytics import TactileAnalyzer
+
+logger = logging.getLogger(__name__)
+
+# 一帧力数据的向量化评估结果
+#   forces: 7x3 三轴力，magnitudes: 每个传感器的合力模长，finger_forces: 每根手指的合力
+#   grasp: 是否抓稳，grasp_sensor: 触发抓稳的传感器编号（0 表示无）
+#   features: TactileFeatures（接触中心、面积、峰值、切向力比）
+ForceEvaluation = namedtuple(
+    "ForceEvaluation", ["seq", "forces", "magnitudes", "finger_forces", "grasp", "grasp_sensor", "features"]
+)
 
 class SmartGrasper:
-    def __init__(self, sensors, actuator):
+    def __init__(self, sensors, actuator, min_period=0.02, frame_timeout=0.5, mode="step", target_force=15.0,
+                 max_touch_age=0.2, max_servo_age=0.3):
         self.sensors :SensorCommunication= sensors
         self.actuator :ServoActuator = actuator
         # 力阈值（不同物体可调节）
         self.min_force = 30     # 检测到物体的最小力
         self.support_force = 10.0 
         self.max_force = 200    # 安全力，超过可能损坏物体
+        self.early_force = 15   # 接触面积足够时，提前判定抓稳的力阈值
+        self.min_contact_area = 8.0  # 提前判定所需的最小接触面积（mm^2）
+        self.analyzer = TactileAnalyzer()
         self.max_pos = {1: 1200, 2: 1200, 3: 1200, 4: 1000}  # 可以根据实际调整
         self.min_pos = {1: 0, 2: 0, 3: 0, 4: 0}
         self.grasp_state = "未抓取"
         self.step = 100         # 每次移动的步长
+        # 手指 -> 传感器编号
+        self.finger_sensors = {
+            1: [5, 6],
+            2: [3, 4],
+            3: [1, 2],
+            4: [7],
+        }
+        self.sensor_ids = (1, 2, 3, 4, 5, 6, 7)
+        self.thumb_id = 7
+        self.fingertip_ids = [2, 6, 1]  # 按优先顺序判断
+        self.fingerpad_ids = [3, 4, 5]
+        # 抓取期间的触觉扫描调度：拇指和指尖每周期读取，指腹每 3 个周期读取
+        self.scan_periods = {sid: 1 for sid in [self.thumb_id] + self.fingertip_ids}
+        self.scan_periods.update({sid: 3 for sid in self.fingerpad_ids})
+        self.scan_priority = {sid: 1 for sid in [self.thumb_id] + self.fingertip_ids}
+        self._build_force_index()
+        self._evaluation = None
+        # 控制模式: "step" 固定步长闭合, "force" 每指力闭环
+        self.mode = mode
+        self.target_force = target_force
+        self.controllers = {}
+        self.attempts = deque(maxlen=20)  # 最近几次抓取的统计
+        self.min_period = min_period        # 两次控制决策之间的最小间隔（秒）
+        self.frame_timeout = frame_timeout  # 等待新力数据帧的超时（秒）
+        self.metrics = {}
+        self._reset_metrics()
         self._running = threading.Event()  # 正确的运行标志
         self._thread = None
+        self.control_task = PeriodicTask("grasper", min_period)
+        # 数据新鲜度：触觉或手指关节数据超龄时不下发新目标（保持当前目标）
+        self.watchdog = StalenessWatchdog()
+        # 抓取关键数据流是拇指 + 任一在线指尖（与抓稳规则一致）；指腹单独登记为非关键，
+        # 掉线或退避中的指尖 / 指腹不会让抓取停住
+        self.watchdog.add_stream("touch", self._grasp_oldest_sample, max_touch_age)
+        self.watchdog.add_stream("touch_pads", self._pad_oldest_sample, max_touch_age, critical=False)
+        self.watchdog.add_stream("servo", lambda: self.actuator.oldest_sample(self.finger_ids), max_servo_age)
         self.lock = threading.RLock()
+    def _live_samples(self, sensor_ids):
+        """sensor_ids 中在线（未退避）且采到过数据的传感器的最近采样时刻列表"""
+        health = self.sensors.get_port_health()
+        stamps = [self.sensors.oldest_sample((sid,)) for sid in sensor_ids
+                  if health.get(sid, {}).get("healthy", True)]
+        return [stamp for stamp in stamps if stamp is not None]
+
+    def _grasp_oldest_sample(self):
+        """
+        抓取关键数据的时刻：拇指与最新一个在线指尖中较旧的那个
+        拇指超龄或所有在线指尖都超龄时才超龄；拇指从未采到或没有在线指尖时返回 None
+        """
+        thumb = self.sensors.oldest_sample((self.thumb_id,))
+        tips = self._live_samples(self.fingertip_ids)
+        if thumb is None or not tips:
+            return None
+        return min(thumb, max(tips))
+
+    def _pad_oldest_sample(self):
+        """在线（未退避）且采到过数据的指腹中最旧一次采样的时刻，没有这样的指腹时返回 None"""
+        stamps = self._live_samples(self.fingerpad_ids)
+        return min(stamps) if stamps else None
+
+    def _build_force_index(self):
+        """根据 finger_sensors 预先计算传感器 -> 手指的求和矩阵和各类传感器下标"""
+        index = {sid: k for k, sid in enumerate(self.sensor_ids)}
+        self.finger_ids = tuple(self.finger_sensors)
+        self._finger_matrix = np.zeros((len(self.finger_ids), len(self.sensor_ids)))
+        self._sensor_finger = {}
+        for row, fid in enumerate(self.finger_ids):
+            for sid in self.finger_sensors[fid]:
+                self._finger_matrix[row, index[sid]] = 1.0
+                self._sensor_finger[sid] = fid
+        self._thumb_index = index[self.thumb_id]
+        self._tip_index = np.array([index[sid] for sid in self.fingertip_ids])
+        self._pad_index = np.array([index[sid] for sid in self.fingerpad_ids])
+
+    def force_array(self, sensor_values) -> np.ndarray:
+        """把 {传感器编号: {"force": [fx, fy, fz]}} 转成 7x3 数组，缺失数据记为 0"""
+        forces = np.zeros((len(self.sensor_ids), 3))
+        for k, sid in enumerate(self.sensor_ids):
+            entry = sensor_values.get(sid)
+            if entry and entry['force'] is not None:
+                forces[k] = entry['force']
+        return forces
+
+    def _taxel_array(self):
+        """按 sensor_ids 顺序堆叠的最新分布力数据 [传感器, 行, 列]，未开启分布力时返回 None"""
+        taxels = self.sensors.get_taxels(self.sensor_ids)
+        if not taxels:
+            return None
+        shape = next(iter(taxels.values()))["data"].shape
+        stacked = np.zeros((len(self.sensor_ids),) + shape, dtype=np.uint8)
+        for k, sid in enumerate(self.sensor_ids):
+            if sid in taxels and taxels[sid]["data"].shape == shape:
+                stacked[k] = taxels[sid]["data"]
+        return stacked
+
+    def _grasp_rule(self, magnitudes: np.ndarray, features=None):
+        """
+        拇指 + 任意指尖 或 任意指腹 抓稳，返回 (是否抓稳, 传感器编号)
+
+        抓稳：合力超过 min_force，或接触面积达到 min_contact_area 且合力超过 early_force
+        （有分布力数据时可提前判定）；有分布力数据的传感器还要求切向力比在摩擦锥内，
+        排除擦碰 / 打滑造成的误触发。没有分布力数据时与原规则相同，不会更严格
+        """
+        if features is None:
+            stable = np.ones(len(magnitudes), dtype=bool)
+            early = np.zeros(len(magnitudes), dtype=bool)
+        else:
+            has_taxels = ~np.isnan(features.area)
+            stable = features.stable | ~has_taxels
+            early = has_taxels & (features.area >= self.min_contact_area) & (magnitudes > self.early_force)
+        thumb, tips, pads = self._thumb_index, self._tip_index, self._pad_index
+        tip_hits = (np.abs(magnitudes[thumb] + magnitudes[tips]) > self.min_force) | (early[thumb] & early[tips])
+        tip_hits &= stable[thumb] & stable[tips]
+        if tip_hits.any():
+            return True, self.fingertip_ids[int(np.argmax(tip_hits))]
+        pad_hits = ((np.abs(magnitudes[pads]) > self.min_force) | early[pads]) & stable[pads]
+        if pad_hits.any():
+            return True, self.fingerpad_ids[int(np.argmax(pad_hits))]
+        return False, 0
+
+    def evaluate(self, snapshot) -> ForceEvaluation:
+        """一次向量化计算整帧的模长、手指合力、触觉特征和抓稳判断，按帧序号缓存"""
+        cached = self._evaluation
+        if cached is not None and cached.seq == snapshot.seq:
+            return cached
+        forces = self.force_array(snapshot.data)
+        magnitudes = np.sqrt(np.einsum("ij,ij->i", forces, forces))
+        finger_forces = self._finger_matrix @ magnitudes
+        features = self.analyzer.analyze(forces, self._taxel_array())
+        grasp, grasp_sensor = self._grasp_rule(magnitudes, features)
+        self._evaluation = ForceEvaluation(snapshot.seq, forces, magnitudes, finger_forces, grasp, grasp_sensor,
+                                           features)
+        return self._evaluation
+
+    def get_features(self):
+        """最近一次评估的触觉特征 {传感器编号: {...}}，NaN / inf 记为 None"""
+        evaluation = self._evaluation
+        if evaluation is None:
+            return {}
+
+        def clean(value):
+            value = float(value)
+            return value if np.isfinite(value) else None
+
+        f = evaluation.features
+        return {
+            sid: {
+                "centroid": [clean(f.centroid[k, 0]), clean(f.centroid[k, 1])],
+                "area": clean(f.area[k]),
+                "peak": clean(f.peak[k]),
+                "shear_ratio": clean(f.shear_ratio[k]),
+                "stable": bool(f.stable[k]),
+            }
+            for k, sid in enumerate(self.sensor_ids)
+        }
+
+    def _reset_metrics(self):
+        """每次开始抓取时清零统计"""
+        self.metrics = {
+            "start_time": time.monotonic(),
+            "time_to_grasp": None,      # 开始抓取到检测到稳定接触的时间（秒）
+            "peak_force": 0.0,          # 接触后单指合力的峰值
+            "overshoot": 0.0,           # 峰值超过 min_force（力闭环模式为 target_force）的部分
+            "frames": 0,                # 处理的力数据帧数
+            "frame_timeouts": 0,        # 等待新帧超时次数
+            "frame_age": None,          # 最近一次决策时力数据的时延（秒）
+            "time_to_stable": None,     # 力闭环模式下所有手指稳定的时间（秒）
+            "held_frames": 0,           # 因数据超龄而保持目标、未下发指令的帧数
+        }
+
+    def get_metrics(self):
+        metrics = dict(self.metrics)
+        metrics.pop("start_time")
+        metrics["mode"] = self.mode
+        metrics["attempts"] = list(self.attempts)
+        return metrics
+
+    def _record_attempt(self):
+        self.attempts.append({
+            "mode": self.mode,
+            "time_to_grasp": self.metrics["time_to_grasp"],
+            "time_to_stable": self.metrics["time_to_stable"],
+            "overshoot": self.metrics["overshoot"],
+        })
+
+    def _reset_controllers(self):
+        """为每根手指创建力闭环控制器"""
+        self.controllers = {
+            fid: FingerForceController(
+                target_force=self.target_force,
+                max_force=self.max_force,
+                max_pos=self.max_pos[fid],
+                min_pos=self.min_pos[fid],
+            )
+            for fid in self.finger_ids
+        }
+
+    def _force_control_step(self, finger_forces, positions, dt):
+        """力闭环模式：每帧按各手指力误差下发位置/速度，返回是否全部结束（抓稳或空抓到限位）"""
+        for fid, controller in self.controllers.items():
+            command = controller.update(finger_forces[fid], positions.get(fid), dt)
+            if command is not None:
+                new_pos, velocity = command
+                self.actuator.set_pos_with_vel(new_pos, velocity, fid)
+        return all(controller.finished for controller in self.controllers.values())
+
     def start_thread(self):
         if self._thread is None or not self._thread.is_alive():
+            self._reset_metrics()
+            self._reset_controllers()
+            self.sensors.set_scan_profile(self.scan_periods, self.scan_priority)
             self._running.set()
             self._thread = threading.Thread(target=self.grasp, daemon=True)
             self._thread.start()
@@ -30,6 +257,9 @@ class SmartGrasper:
         # 避免线程在自己里面 join 自己
         if self._thread is not None and threading.current_thread() != self._thread:
             self._thread.join()
+            if self.metrics["time_to_stable"] is None:
+                self._record_attempt()
+        self.sensors.reset_scan_profile()
         self._thread = None
     def safe_sum(self, val):
         """
@@ -60,76 +290,94 @@ class SmartGrasper:
         :param sensor_count: 传感器数量
         :return: True 抓稳, False 未抓稳
         """
-        # 1. 定义拇指和指尖、指腹传感器编号
-        thumb_id = 7
-        fingertip_ids = [2,6,1]  # `假设 2=食指尖, 3=中指尖, 4=无名指尖
-        fingerpad_ids = [3, 4,5]  # 剩下的是指腹
-
-        # 2. 获取拇指力
-        thumb_val = self.safe_sum(sensor_values.get(thumb_id, 0)['force'])
-
-        # 3. 条件1：拇指 + 任意指尖
-        for fid in fingertip_ids:
-            tip_val = self.safe_sum(sensor_values.get(fid, 0)['force'])
-            if abs(thumb_val + tip_val) > self.min_force:
-                return True, fid
-
-        # 4. 条件2：任意指腹
-        for fid in fingerpad_ids:
-            pad_val = self.safe_sum(sensor_values.get(fid, 0)['force'])
-            if abs(pad_val) > self.min_force:
-                return True, fid
-        return False,0
+        forces = self.force_array(sensor_values)
+        return self._grasp_rule(np.sqrt(np.einsum("ij,ij->i", forces, forces)), self.analyzer.analyze(forces))
 
     def grasp(self):
          # 其他手指的贴合力阈值
 
         grasped = False
         grasp_finger = None
+        stable = False
+        last_seq = self.sensors.get_snapshot().seq
+        last_tick = time.monotonic()
+        task = self.control_task
+        task.reset()
+        self._holding = False
 
-        while self._running.is_set():
-            finger_sensors = {
-                1: [5, 6],
-                2: [3, 4],
-                3: [1, 2],
-                4: [7],
-            }
+        while task.wait(self._running):
+            # 等待新的力数据帧，收到即做一次控制决策
+            snapshot = self.sensors.wait_for_frame(last_seq, self.frame_timeout)
+            if not self._running.is_set():
+                break
+            if snapshot is None:
+                self.metrics["frame_timeouts"] += 1
+                continue
+            tick_start = task.begin()
+            dt, last_tick = tick_start - last_tick, tick_start
+            last_seq = snapshot.seq
+            self.metrics["frames"] += 1
+            self.metrics["frame_age"] = tick_start - snapshot.timestamp
+
+            finger_sensors = self.finger_sensors
 
-            all_forces = self.sensors.force_data
-            sensor_count = len(all_forces)
+            # 任一关键数据流超龄：保持当前目标，不在旧数据上继续闭合
+            stale = self.watchdog.check(tick_start)
+            if stale:
+                if not self._holding:
+                    print(f"[WARN] 数据超龄 {stale}，保持当前目标")
+                self._holding = True
+                self.metrics["held_frames"] += 1
+                task.end(tick_start)
+                continue
+            self._holding = False
 
-            with self.lock:
-                positions = dict(list(self.actuator.positions.items())[:4])
+            # 快照读取：同一扫描周期的力数据和同一轮询周期的关节位置，无需加锁
+            evaluation = self.evaluate(snapshot)
 
-            finger_forces = {}
+            positions = dict(list(self.actuator.positions.items())[:4])
 
-            for fid, sids in finger_sensors.items():
-                total_force = sum(
-                    self.safe_sum(all_forces[sid]['force'])
-                    for sid in sids if sid in all_forces
-                )
-                finger_forces[fid] = total_force
-                print(f"finger {fid}: {total_force:.2f}")
+            finger_forces = dict(zip(self.finger_ids, evaluation.finger_forces.tolist()))
+            # 每帧的调试输出走 logging.debug，避免在控制循环里逐帧打印
+            logger.debug("finger forces: %s", finger_forces)
+
+            if self.mode == "force":
+                # ========= 力闭环模式：每指独立调节到目标接触力 =========
+                if evaluation.grasp and not grasped:
+                    grasped = True
+                    self.metrics["time_to_grasp"] = tick_start - self.metrics["start_time"]
+                all_finished = self._force_control_step(finger_forces, positions, dt)
+                contact = any(controller.in_contact for controller in self.controllers.values())
+                if all_finished and contact and not stable:
+                    # 只有接触到物体才算抓稳；全部空抓到限位不记 time_to_stable
+                    stable = True
+                    self.metrics["time_to_stable"] = tick_start - self.metrics["start_time"]
+                    self._record_attempt()
+                    print(f"力闭环抓取稳定 ✅ 用时 {self.metrics['time_to_stable']:.3f}s", finger_forces)
+                if stable:
+                    self.grasp_state = "已抓取"
+                elif all_finished:
+                    self.grasp_state = "未抓取"  # 已闭合到限位，未接触到物体
+                else:
+                    self.grasp_state = "抓取中"
 
             # ========= 阶段1：检测主手指抓取 =========
-            if not grasped:
-                for fid in finger_sensors:
-                    grasp, fid = self.check_grasp(all_forces, sensor_count)
-                    fid_ =  [key for key,value in finger_sensors.items() if fid in value]
-                    print(f"check_grasp: {grasp}, finger {fid_}")
-                    if grasp:
-                        print(f"finger {fid_} 已稳定抓取 ✅", finger_forces, self.actuator.positions)
-                        self.grasp_state = "已抓取"
-                        grasped = True
-                        grasp_finger = fid_
-                        break
+            elif not grasped:
+                fid_ = self._sensor_finger.get(evaluation.grasp_sensor)
+                logger.debug("check_grasp: %s, finger %s", evaluation.grasp, fid_)
+                if evaluation.grasp:
+                    print(f"finger {fid_} 已稳定抓取 ✅", finger_forces, self.actuator.positions)
+                    self.grasp_state = "已抓取"
+                    grasped = True
+                    grasp_finger = fid_
+                    self.metrics["time_to_grasp"] = tick_start - self.metrics["start_time"]
 
                 if not grasped:
                     # 没有手指抓到，就继续闭合所有手指
                     for fid in finger_sensors:
                         new_pos = positions[fid] + self.step
                         new_pos = min(new_pos, self.max_pos[fid])
-                        print(f"Moving finger {fid} to {new_pos}")
+                        logger.debug("Moving finger %s to %s", fid, new_pos)
                         self.actuator.set_pos_with_vel(new_pos, 100, fid)
                     self.grasp_state = "抓取中"
 
@@ -141,19 +389,26 @@ class SmartGrasper:
                     # print(fid, grasp_finger)
                     total_force = finger_forces[fid]
                     if total_force < self.support_force:  # 继续闭合
-                        print(f"finger {fid} 力量不足，继续闭合 (force={total_force:.2f})")
                         new_pos = positions[fid] + self.step
                         new_pos = min(new_pos, self.max_pos[fid])
-                        print(f"Moving finger {fid} (support) to {new_pos}")
+                        logger.debug("finger %s 力量不足，继续闭合到 %s (force=%.2f)", fid, new_pos, total_force)
                         self.actuator.set_pos_with_vel(new_pos, 100, fid)
                     else:
-                        print(f"finger {fid} 已贴合物体 ✅ (force={total_force:.2f})")
+                        logger.debug("finger %s 已贴合物体 (force=%.2f)", fid, total_force)
+
+            if self.mode == "force":
+                in_contact = any(controller.in_contact for controller in self.controllers.values())
+                reference = self.target_force
+            else:
+                in_contact, reference = grasped, self.min_force
+            if in_contact:
+                peak = max(finger_forces.values(), default=0.0)
+                if peak > self.metrics["peak_force"]:
+                    self.metrics["peak_force"] = peak
+                    self.metrics["overshoot"] = max(0.0, peak - reference)
 
-            # 循环间隔
-            for _ in range(5):
-                if not self._running.is_set():
-                    break
-                time.sleep(0.1)
+            # 最小控制周期由 control_task 的截止时间保证
+            task.end(tick_start)
 
     def release(self):
         """张开所有手指，松开物体"""
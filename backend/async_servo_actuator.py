@@ -0,0 +1,219 @@
+import asyncio
+import threading
+from collections import deque
+
+import serial
+
+from backend.servo_actuator import ServoProtocol
+
+
+class AsyncServoActuator(ServoProtocol):
+    """
+    基于 asyncio 的电缸总线驱动
+
+    串口以非阻塞方式打开并注册到事件循环（loop.add_reader），收到的字节
+    由帧拆分器切成应答帧，再按 (ID, 指令类型) 分发给等待中的 Future。
+    每条指令返回一个 awaitable，多个协程可以同时使用总线，不需要每个调用方
+    一个线程，也不需要全局锁。仅支持可 select 的串口（Linux / macOS）。
+
+    用法:
+        servo = AsyncServoActuator("/dev/ttyUSB0")
+        await servo.open()
+        status = await servo.read_status(1)
+        await servo.set_pos_with_vel(600, 200, 1)
+        servo.close()
+    """
+
+    def __init__(self, port="/dev/ttyUSB0", baudrate=921600, reply_timeout=0.01, max_in_flight=6):
+        """
+        参数:
+            port / baudrate: 串口参数
+            reply_timeout: 单条指令等待应答的默认时间（秒）
+            max_in_flight: 同时在总线上等待应答的指令数上限
+        """
+        self.port = port
+        self.baudrate = baudrate
+        self.reply_timeout = reply_timeout
+        self.max_in_flight = max_in_flight
+        self.ser = None
+        self.reader = None
+        self.loop = None
+        self._in_flight = None
+        # 等待应答的 Future：{(id, cmd): deque[Future]}，同一键按发送顺序匹配
+        self._pending = {}
+        self.stats = {"sent": 0, "received": 0, "timeouts": 0, "unmatched": 0}
+
+    async def open(self):
+        """打开串口并注册到当前事件循环"""
+        self.loop = asyncio.get_running_loop()
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self.ser = serial.Serial(self.port, self.baudrate, timeout=0)
+        self.reader = self._make_reader(self.ser)
+        self.loop.add_reader(self.ser.fileno(), self._on_readable)
+        return self
+
+    def close(self):
+        if self.ser is None:
+            return
+        self.loop.remove_reader(self.ser.fileno())
+        for waiters in self._pending.values():
+            for future in waiters:
+                if not future.done():
+                    future.cancel()
+        self._pending.clear()
+        self.ser.close()
+        self.ser = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---------------- 帧分发 ----------------
+    def _on_readable(self):
+        """事件循环回调：读出所有可用字节，把完整应答帧交给对应的 Future"""
+        try:
+            data = self.ser.read(self.ser.in_waiting or 1)
+        except serial.SerialException as e:
+            print("[ERROR] servo bus read failed:", e)
+            return
+        for frame in self.reader.feed(data):
+            self._dispatch(frame)
+
+    def _dispatch(self, frame: bytes):
+        waiters = self._pending.get((frame[3], frame[4]))
+        while waiters:
+            future = waiters.popleft()
+            if not future.done():
+                self.stats["received"] += 1
+                future.set_result(frame)
+                return
+        self.stats["unmatched"] += 1
+
+    async def request(self, cmd_bytes: bytes, timeout: float = None) -> bytes:
+        """
+        发送一帧指令，等待同 ID、同指令类型的应答帧
+
+        返回:
+            应答帧字节，超时返回 b''（与 ServoActuator._send_cmd 一致）
+        """
+        timeout = self.reply_timeout if timeout is None else timeout
+        key = (cmd_bytes[3], cmd_bytes[4])
+        async with self._in_flight:
+            future = self.loop.create_future()
+            waiters = self._pending.setdefault(key, deque())
+            waiters.append(future)
+            self.ser.write(cmd_bytes)
+            self.stats["sent"] += 1
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                return b''
+            finally:
+                if future in waiters:
+                    waiters.remove(future)
+
+    # ---------------- 指令 ----------------
+    async def read_status(self, id_addr):
+        """读取电缸状态，超时返回 None"""
+        resp = await self.request(self._build_cmd(self.CMD_RD_STATUS, id_addr=id_addr))
+        return self._parse_status_frame(resp)
+
+    async def read_status_batch(self, ids=None, timeout=None):
+        """并发读取多个电缸状态，返回 {id: JointStatus 或 None}"""
+        ids = self.JOINT_IDS if ids is None else ids
+        frames = await asyncio.gather(*(
+            self.request(self._build_cmd(self.CMD_RD_STATUS, id_addr=i), timeout) for i in ids))
+        return {i: self._parse_status_frame(frame) for i, frame in zip(ids, frames)}
+
+    async def read_register(self, reg_addr: int, count: int = 1, id_addr=None):
+        """读寄存器，返回应答帧（超时返回 b''）"""
+        return await self.request(self._build_cmd(self.CMD_RD_REGISTER, reg_addr, count, id_addr=id_addr))
+
+    async def read_registers(self, id_addr, reg_addr: int, count: int = 1):
+        """读取 count 个寄存器并解码为整数列表，无应答返回 None"""
+        frame = await self.read_register(reg_addr, count, id_addr)
+        return self._parse_register_frame(frame, count)
+
+    async def write_registers(self, reg_addr: int, values, id_addr=None):
+        """从 reg_addr 开始连续写寄存器，返回应答帧（超时返回 b''）"""
+        return await self.request(self._build_cmd(self.CMD_WR_REGISTER, reg_addr, list(values), id_addr=id_addr))
+
+    async def set_mode(self, mode: int, id_addr=None):
+        """设置控制模式 (0-定位,1-伺服,2-速度,4-电压)"""
+        return await self.write_registers(0x25, [mode], id_addr)
+
+    async def set_pos_with_vel(self, position: int, velocity: int, id_addr=None):
+        """设置目标位置和速度（步）"""
+        return await self.write_registers(0x25, [2, 0, 0, velocity, position], id_addr)
+
+    async def clear_fault(self, id_addr=None):
+        """清除故障，id_addr 为 None 时清除所有关节"""
+        ids = self.JOINT_IDS if id_addr is None else (id_addr,)
+        return await asyncio.gather(*(self.write_registers(0x18, [1], i) for i in ids))
+
+    async def pause_motion(self, id_addr=None):
+        """暂停运动，id_addr 为 None 时暂停所有关节"""
+        ids = self.JOINT_IDS if id_addr is None else (id_addr,)
+        return await asyncio.gather(*(self.write_registers(0x1A, [1], i) for i in ids))
+
+
+class BlockingServoActuator:
+    """
+    AsyncServoActuator 的阻塞封装
+
+    在后台线程中运行事件循环，普通线程通过 run_coroutine_threadsafe 调用，
+    接口与 AsyncServoActuator 相同但直接返回结果。
+    """
+
+    def __init__(self, port="/dev/ttyUSB0", baudrate=921600, reply_timeout=0.01, max_in_flight=6):
+        self.bus = AsyncServoActuator(port, baudrate, reply_timeout, max_in_flight)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+        self._call(self.bus.open())
+
+    def _call(self, coro, timeout=1.0):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def close(self):
+        if self._thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.bus.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self._thread = None
+        self.loop.close()
+
+    @property
+    def stats(self):
+        return dict(self.bus.stats)
+
+    def read_status(self, id_addr):
+        return self._call(self.bus.read_status(id_addr))
+
+    def read_status_batch(self, ids=None, timeout=None):
+        return self._call(self.bus.read_status_batch(ids, timeout))
+
+    def read_register(self, reg_addr: int, count: int = 1, id_addr=None):
+        return self._call(self.bus.read_register(reg_addr, count, id_addr))
+
+    def read_registers(self, id_addr, reg_addr: int, count: int = 1):
+        return self._call(self.bus.read_registers(id_addr, reg_addr, count))
+
+    def write_registers(self, reg_addr: int, values, id_addr=None):
+        return self._call(self.bus.write_registers(reg_addr, values, id_addr))
+
+    def set_mode(self, mode: int, id_addr=None):
+        return self._call(self.bus.set_mode(mode, id_addr))
+
+    def set_pos_with_vel(self, position: int, velocity: int, id_addr=None):
+        return self._call(self.bus.set_pos_with_vel(position, velocity, id_addr))
+
+    def clear_fault(self, id_addr=None):
+        return self._call(self.bus.clear_fault(id_addr))
+
+    def pause_motion(self, id_addr=None):
+        return self._call(self.bus.pause_motion(id_addr))
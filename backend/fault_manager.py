@@ -0,0 +1,61 @@
+import time
+from collections import deque
+
+
+class FaultManager:
+    """
+    关节故障管理：根据状态流跟踪每个关节的故障码，
+    只对出现故障的关节发清除指令，并限制清除频率，保留最近的故障记录
+    """
+
+    def __init__(self, ids, min_clear_interval: float = 0.5, history: int = 8):
+        """
+        参数:
+            ids: 关节 ID 列表
+            min_clear_interval: 同一关节两次清除之间的最小间隔（秒）
+            history: 每个关节保留的故障记录条数
+        """
+        self.min_clear_interval = min_clear_interval
+        self.error_code = {i: 0 for i in ids}
+        self.fault_count = {i: 0 for i in ids}
+        self.clear_count = {i: 0 for i in ids}
+        self.history = {i: deque(maxlen=history) for i in ids}
+        self._last_clear = {i: float("-inf") for i in ids}
+
+    def update(self, statuses):
+        """用一次轮询的 JointStatus 序列更新故障状态，故障码变化时记录"""
+        for status in statuses:
+            if status is None:
+                continue
+            id_addr, code = status.id, status.error_code
+            if id_addr not in self.error_code or code == self.error_code[id_addr]:
+                continue
+            if code:
+                self.fault_count[id_addr] += 1
+            self.history[id_addr].append({"time": time.time(), "error_code": code})
+            self.error_code[id_addr] = code
+
+    def faulted(self):
+        """当前有故障的关节"""
+        return [i for i, code in self.error_code.items() if code]
+
+    def due_for_clear(self, now: float = None):
+        """有故障且距上次清除已超过最小间隔的关节"""
+        now = time.monotonic() if now is None else now
+        return [i for i in self.faulted() if now - self._last_clear[i] >= self.min_clear_interval]
+
+    def mark_cleared(self, id_addr, now: float = None):
+        self._last_clear[id_addr] = time.monotonic() if now is None else now
+        self.clear_count[id_addr] += 1
+
+    def report(self):
+        """各关节当前故障码、故障 / 清除次数和最近的故障记录"""
+        return {
+            i: {
+                "error_code": self.error_code[i],
+                "fault_count": self.fault_count[i],
+                "clear_count": self.clear_count[i],
+                "history": list(self.history[i]),
+            }
+            for i in self.error_code
+        }
@@ -0,0 +1,127 @@
+class FingerForceController:
+    """
+    单指力闭环控制器（PID 导纳）
+
+    未接触时按接近速度闭合；接触后根据力误差计算位置增量，
+    增量越大速度越快，误差越小动作越柔；超过 max_force 立即回退。
+    所有目标都以实测位置为基准计算，目标领先实测位置不超过 approach_step，
+    避免目标先跑到限位而手指还没到。
+    """
+
+    def __init__(self, target_force=15.0, max_force=200.0, max_pos=1200, min_pos=0,
+                 kp=4.0, ki=1.0, kd=0.0, contact_force=3.0,
+                 approach_step=80, max_step=40,
+                 approach_velocity=300, min_velocity=20, max_velocity=200,
+                 tolerance=3.0, stable_frames=5, limit_margin=10):
+        """
+        参数:
+            target_force: 目标接触力
+            max_force: 安全力上限，超过后回退
+            max_pos / min_pos: 位置限位（步）
+            kp, ki, kd: 力误差 -> 位置增量（步）的 PID 系数
+            contact_force: 判定已接触的力阈值
+            approach_step: 未接触时目标领先实测位置的最大步数（每帧前进 approach_velocity * dt）
+            max_step: 接触后每帧位置增量上限
+            approach_velocity: 接近阶段速度
+            min_velocity / max_velocity: 接触阶段速度范围
+            tolerance: 力误差在此范围内视为稳定
+            stable_frames: 连续稳定多少帧视为抓稳
+            limit_margin: 实测位置距 max_pos 不超过该步数视为已到达限位
+        """
+        self.target_force = target_force
+        self.max_force = max_force
+        self.max_pos = max_pos
+        self.min_pos = min_pos
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.contact_force = contact_force
+        self.approach_step = approach_step
+        self.max_step = max_step
+        self.approach_velocity = approach_velocity
+        self.min_velocity = min_velocity
+        self.max_velocity = max_velocity
+        self.tolerance = tolerance
+        self.stable_frames = stable_frames
+        self.limit_margin = limit_margin
+        self.reset()
+
+    def reset(self):
+        self.target_pos = None
+        self.position = None  # 最近一次实测位置
+        self.integral = 0.0
+        self.last_error = None
+        self.stable_count = 0
+        self.in_contact = False
+
+    @property
+    def stable(self) -> bool:
+        """已接触，且力误差连续 stable_frames 帧在容差内"""
+        return self.in_contact and self.stable_count >= self.stable_frames
+
+    @property
+    def at_limit(self) -> bool:
+        """未接触，且实测位置已闭合到限位（空抓）"""
+        return not self.in_contact and self.position is not None and self.position >= self.max_pos - self.limit_margin
+
+    @property
+    def finished(self) -> bool:
+        """该手指不再需要动作：抓稳或空抓到限位"""
+        return self.stable or self.at_limit
+
+    def update(self, force: float, position, dt: float):
+        """
+        根据一帧力数据计算下一步指令
+
+        参数:
+            force: 当前手指合力
+            position: 当前实际位置（None 时以上一次下发的目标为基准）
+            dt: 距上一帧的时间（秒）
+
+        返回:
+            (目标位置, 速度)，无需动作时返回 None
+        """
+        if position is None:
+            if self.target_pos is None:
+                return None
+            base = self.target_pos
+        else:
+            self.position = base = position
+        if self.target_pos is None:
+            self.target_pos = base
+        dt = max(dt, 1e-3)
+
+        if force > self.max_force:
+            # 超过安全力，从实测位置直接回退一个最大步长
+            self.integral = 0.0
+            self.stable_count = 0
+            return self._command(base - self.max_step, self.max_velocity)
+
+        if not self.in_contact and force < self.contact_force:
+            # 目标按接近速度推进，但领先实测位置不超过 approach_step
+            advance = self.approach_velocity * dt
+            target = min(max(self.target_pos, base) + advance, base + self.approach_step)
+            return self._command(target, self.approach_velocity)
+        self.in_contact = True
+
+        error = self.target_force - force
+        self.stable_count = self.stable_count + 1 if abs(error) <= self.tolerance else 0
+        derivative = 0.0 if self.last_error is None else (error - self.last_error) / dt
+        self.last_error = error
+        # 积分限幅，防止长时间接触时饱和
+        limit = self.max_step / self.ki if self.ki else 0.0
+        self.integral = max(-limit, min(limit, self.integral + error * dt))
+
+        delta = self.kp * error + self.ki * self.integral + self.kd * derivative
+        delta = max(-self.max_step, min(self.max_step, delta))
+        if abs(delta) < 1:
+            return None
+        velocity = self.min_velocity + (self.max_velocity - self.min_velocity) * abs(delta) / self.max_step
+        return self._command(base + delta, velocity)
+
+    def _command(self, target, velocity):
+        new_pos = int(round(max(self.min_pos, min(self.max_pos, target))))
+        if new_pos == self.target_pos:
+            return None
+        self.target_pos = new_pos
+        return new_pos, int(velocity)
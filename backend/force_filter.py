@@ -0,0 +1,149 @@
+import threading
+
+import numpy as np
+
+
+class ForceFilterBank:
+    """
+    三轴力滤波器组
+
+    预分配 [传感器, 最大窗口, 3] 的环形缓冲，每个传感器可单独选择滤波方式和窗口：
+        "mean"   滑动平均，维护累加和，每次更新 O(1)
+        "ema"    指数平滑，alpha 越大越跟手
+        "median" 滑动中值，抗单帧尖峰
+        "kalman" 每轴独立的一维卡尔曼（常值模型），q 为过程噪声、r 为测量噪声
+        "none"   不滤波，直接输出最新值
+    """
+
+    KINDS = ("mean", "ema", "median", "kalman", "none")
+
+    def __init__(self, sensor_ids, window: int = 3, kind: str = "mean", max_window: int = 16,
+                 alpha: float = 0.5, q: float = 1.0, r: float = 4.0):
+        """
+        参数:
+            sensor_ids: 传感器编号
+            window: 默认窗口长度（mean / median）
+            kind: 默认滤波方式
+            max_window: 窗口长度上限（决定预分配缓冲大小）
+            alpha: ema 系数
+            q / r: kalman 过程噪声 / 测量噪声
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"未知滤波方式: {kind}")
+        self.sensor_ids = tuple(sensor_ids)
+        self.index = {sensor_id: k for k, sensor_id in enumerate(self.sensor_ids)}
+        self.max_window = max_window
+        n = len(self.sensor_ids)
+        self.buffer = np.zeros((n, max_window, 3))
+        self.sums = np.zeros((n, 3))
+        self.count = np.zeros(n, dtype=int)   # 窗口内已有的样本数
+        self.pos = np.zeros(n, dtype=int)     # 下一个写入位置
+        self.state = np.zeros((n, 3))         # ema / kalman 的估计值
+        self.variance = np.zeros((n, 3))      # kalman 的估计方差
+        self.output = np.full((n, 3), np.nan)
+        self.window = np.full(n, max(1, min(window, max_window)), dtype=int)
+        self.kind = [kind] * n
+        self.alpha = np.full(n, alpha)
+        self.q = np.full(n, q)
+        self.r = np.full(n, r)
+        self._lock = threading.Lock()  # 采集线程 update 与接口线程 configure 互斥
+
+    def configure(self, sensor_id: int, kind: str = None, window: int = None,
+                  alpha: float = None, q: float = None, r: float = None):
+        """修改单个传感器的滤波方式或参数，修改后该传感器的滤波状态清零"""
+        k = self.index[sensor_id]
+        if kind is not None and kind not in self.KINDS:
+            raise ValueError(f"未知滤波方式: {kind}")
+        with self._lock:
+            self._configure(k, kind, window, alpha, q, r)
+
+    def _configure(self, k, kind, window, alpha, q, r):
+        if kind is not None:
+            self.kind[k] = kind
+        if window is not None:
+            self.window[k] = max(1, min(int(window), self.max_window))
+        if alpha is not None:
+            self.alpha[k] = alpha
+        if q is not None:
+            self.q[k] = q
+        if r is not None:
+            self.r[k] = r
+        self._reset(k)
+
+    def reset(self, sensor_id: int = None):
+        """清空滤波状态，sensor_id 为 None 时清空全部传感器"""
+        ks = range(len(self.sensor_ids)) if sensor_id is None else (self.index[sensor_id],)
+        with self._lock:
+            for k in ks:
+                self._reset(k)
+
+    def _reset(self, k):
+        self.sums[k] = 0.0
+        self.count[k] = 0
+        self.pos[k] = 0
+        self.output[k] = np.nan
+
+    def update(self, sensor_id: int, force) -> np.ndarray:
+        """加入一个新样本 [fx, fy, fz]，返回该传感器的滤波输出"""
+        k = self.index[sensor_id]
+        sample = np.asarray(force, dtype=float)
+        with self._lock:
+            return self._update(k, sample).copy()
+
+    def _update(self, k, sample):
+        kind = self.kind[k]
+        first = self.count[k] == 0
+
+        # 环形缓冲：mean / median 需要窗口内的历史样本
+        window = self.window[k]
+        slot = self.pos[k]
+        if self.count[k] >= window:
+            self.sums[k] -= self.buffer[k, slot]
+        else:
+            self.count[k] += 1
+        self.buffer[k, slot] = sample
+        self.sums[k] += sample
+        self.pos[k] = (slot + 1) % window
+
+        if kind == "mean":
+            out = self.sums[k] / self.count[k]
+        elif kind == "median":
+            out = np.median(self.buffer[k, :self.count[k]], axis=0)
+        elif kind == "ema":
+            self.state[k] = sample if first else self.alpha[k] * sample + (1 - self.alpha[k]) * self.state[k]
+            out = self.state[k]
+        elif kind == "kalman":
+            if first:
+                self.state[k] = sample
+                self.variance[k] = self.r[k]
+            else:
+                predicted = self.variance[k] + self.q[k]
+                gain = predicted / (predicted + self.r[k])
+                self.state[k] += gain * (sample - self.state[k])
+                self.variance[k] = (1 - gain) * predicted
+            out = self.state[k]
+        else:
+            out = sample
+        self.output[k] = out
+        return self.output[k]
+
+    def value(self, sensor_id: int):
+        """该传感器最近一次滤波输出，尚无样本时返回 None"""
+        k = self.index[sensor_id]
+        with self._lock:
+            return None if self.count[k] == 0 else self.output[k].copy()
+
+    def get_config(self):
+        """{传感器编号: 滤波方式和参数}"""
+        config = {}
+        for sensor_id, k in self.index.items():
+            kind = self.kind[k]
+            entry = {"kind": kind}
+            if kind in ("mean", "median"):
+                entry["window"] = int(self.window[k])
+            elif kind == "ema":
+                entry["alpha"] = float(self.alpha[k])
+            elif kind == "kalman":
+                entry.update(q=float(self.q[k]), r=float(self.r[k]))
+            config[sensor_id] = entry
+        return config
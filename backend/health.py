@@ -0,0 +1,53 @@
+from typing import Any, Dict
+
+
+class HealthTracker:
+    """单个端口/设备的健康状态：连续失败后指数退避，退避到期后重新探测"""
+
+    def __init__(self, fail_threshold: int = 2, base_backoff: float = 0.1, max_backoff: float = 5.0):
+        """
+        参数:
+            fail_threshold: 连续失败多少次后开始退避
+            base_backoff: 首次退避时间（秒），之后每次失败翻倍
+            max_backoff: 退避时间上限（秒）
+        """
+        self.fail_threshold = fail_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.ok = 0             # 成功次数
+        self.failures = 0       # 失败次数
+        self.skipped = 0        # 因退避跳过的次数
+        self.consecutive = 0    # 连续失败次数
+        self.last_error = None  # 最近一次失败的错误码（无应答为 None）
+        self.next_probe = 0.0   # 退避结束时刻 time.monotonic()
+
+    @property
+    def healthy(self) -> bool:
+        return self.consecutive < self.fail_threshold
+
+    def due(self, now: float) -> bool:
+        """本周期是否应读取该端口"""
+        return self.healthy or now >= self.next_probe
+
+    def record_ok(self):
+        self.ok += 1
+        self.consecutive = 0
+        self.last_error = None
+
+    def record_failure(self, now: float, error=None):
+        self.failures += 1
+        self.consecutive += 1
+        self.last_error = error
+        if not self.healthy:
+            backoff = self.base_backoff * 2 ** (self.consecutive - self.fail_threshold)
+            self.next_probe = now + min(backoff, self.max_backoff)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "ok": self.ok,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "consecutive_failures": self.consecutive,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+
+from backend.health import HealthTracker
+
+logger = logging.getLogger(__name__)
+
+
+class LinkSupervisor:
+    """
+    串口链路监管
+
+    驱动在收发出错时调用 report_lost()，链路立即进入 degraded 状态并返回，
+    不在调用方线程里重连；后台线程按指数退避（有上限）反复调用 reconnect，
+    成功后回到 connected。统计断线次数、重连用时和重连成功率。
+    """
+
+    CONNECTED = "connected"
+    DEGRADED = "degraded"
+
+    def __init__(self, reconnect, name: str = "link", base_backoff: float = 0.5, max_backoff: float = 10.0):
+        """
+        参数:
+            reconnect: 无参函数，尝试重连一次，成功返回 True（可以阻塞，只在监管线程中调用）
+            name: 日志中使用的链路名称
+            base_backoff / max_backoff: 重连失败后的首次等待时间和等待上限（秒）
+        """
+        self.reconnect = reconnect
+        self.name = name
+        self.state = self.CONNECTED
+        self.backoff = HealthTracker(fail_threshold=1, base_backoff=base_backoff, max_backoff=max_backoff)
+        self._lost = threading.Event()
+        self._running = threading.Event()
+        self._thread = None
+        self._lost_at = None
+        self.stats = {"outages": 0, "attempts": 0, "successes": 0, "last_error": None,
+                      "last_duration": None, "max_duration": 0.0, "total_downtime": 0.0}
+
+    @property
+    def connected(self) -> bool:
+        return self.state == self.CONNECTED
+
+    def report_lost(self, error=None):
+        """标记链路断开（不阻塞），唤醒监管线程"""
+        if self.state == self.DEGRADED:
+            return
+        self.state = self.DEGRADED
+        self._lost_at = time.monotonic()
+        self.stats["outages"] += 1
+        self.stats["last_error"] = None if error is None else str(error)
+        logger.warning(f"{self.name} 链路断开，进入降级状态: {error}")
+        self._lost.set()
+
+    def run(self):
+        while self._running.is_set():
+            if not self._lost.wait(0.2):
+                continue
+            now = time.monotonic()
+            if not self.backoff.due(now):
+                time.sleep(min(0.2, self.backoff.next_probe - now))
+                continue
+            self.stats["attempts"] += 1
+            try:
+                ok = self.reconnect()
+            except Exception as e:
+                logger.error(f"{self.name} 重连出错: {e}")
+                ok = False
+            if ok:
+                self._on_reconnected()
+            else:
+                self.backoff.record_failure(time.monotonic())
+
+    def _on_reconnected(self):
+        duration = time.monotonic() - self._lost_at
+        self.stats["successes"] += 1
+        self.stats["last_duration"] = duration
+        self.stats["max_duration"] = max(self.stats["max_duration"], duration)
+        self.stats["total_downtime"] += duration
+        self.backoff.record_ok()
+        self._lost.clear()
+        self.state = self.CONNECTED
+        logger.warning(f"{self.name} 重连成功，用时 {duration:.2f}s")
+
+    def get_stats(self):
+        """链路状态、断线次数、重连尝试 / 成功次数、成功率和重连用时（秒）"""
+        stats = dict(self.stats)
+        attempts = stats["attempts"]
+        stats["state"] = self.state
+        stats["success_rate"] = round(stats["successes"] / attempts, 3) if attempts else None
+        stats["down_for"] = time.monotonic() - self._lost_at if self.state == self.DEGRADED else 0.0
+        stats["next_retry_in"] = max(0.0, self.backoff.next_probe - time.monotonic()) if self.backoff.consecutive else 0.0
+        return stats
+
+    def start_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._running.set()
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+
+    def stop_thread(self):
+        self._running.clear()
+        if self._thread is not None and threading.current_thread() != self._thread:
+            self._thread.join()
+        self._thread = None
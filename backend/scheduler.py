@@ -0,0 +1,175 @@
+import threading
+import time
+
+
+class PeriodicTask:
+    """
+    固定周期任务
+
+    按 time.monotonic() 的绝对截止时间推进（next_deadline += period），不随执行时间漂移；
+    执行超过下一个截止时间记为一次超时，并跳过已经错过的周期。
+    可以由 loop() 在调用方线程中驱动，也可以在已有的事件循环里用 due() / run_once()
+    或 begin() / end() 计时。
+    """
+
+    # 启动延迟直方图的分桶上界（毫秒）
+    JITTER_BINS_MS = (0.1, 0.5, 1, 2, 5, 10, 20, 50)
+
+    def __init__(self, name: str, period: float, func=None, registry=None):
+        """
+        参数:
+            name: 任务名（统计接口中的键）
+            period: 周期（秒）
+            func: 每周期执行的函数（使用 begin() / end() 自行计时时可为 None）
+            registry: 注册到的 Scheduler，默认为模块级 scheduler
+        """
+        self.name = name
+        self.period = period
+        self.func = func
+        self._lock = threading.Lock()
+        self.reset()
+        (scheduler if registry is None else registry).register(self)
+
+    def reset(self):
+        """从当前时刻重新开始计时并清空统计"""
+        with self._lock:
+            self.next_deadline = time.monotonic()
+            self._last_start = None
+            self._deadline = None
+            self.runs = 0
+            self.overruns = 0
+            self.skipped = 0
+            self.exec_last = 0.0
+            self.exec_total = 0.0
+            self.exec_max = 0.0
+            self.interval_total = 0.0
+            self.interval_max = 0.0
+            self.jitter_max = 0.0
+            self.histogram = [0] * (len(self.JITTER_BINS_MS) + 1)
+
+    def due(self, now: float = None) -> bool:
+        now = time.monotonic() if now is None else now
+        return now >= self.next_deadline
+
+    def time_until(self, now: float = None) -> float:
+        """距下一个截止时间的秒数（已到期为 0）"""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.next_deadline - now)
+
+    def wait(self, running: threading.Event = None) -> bool:
+        """
+        睡眠到下一个截止时间；传入 running 时可被 clear() 提前唤醒
+
+        返回:
+            running 仍为 set（或未传入 running）时为 True
+        """
+        delay = self.time_until()
+        if running is None:
+            if delay > 0:
+                time.sleep(delay)
+            return True
+        while delay > 0 and running.is_set():
+            # Event 没有"被清除"通知，分段等待以便及时退出
+            time.sleep(min(delay, 0.05))
+            delay = self.time_until()
+        return running.is_set()
+
+    def begin(self) -> float:
+        """标记本周期开始执行，记录相对截止时间的启动延迟"""
+        start = time.monotonic()
+        with self._lock:
+            self._deadline = self.next_deadline
+            jitter = max(0.0, start - self.next_deadline)
+            self.jitter_max = max(self.jitter_max, jitter)
+            jitter_ms = jitter * 1000
+            for k, bound in enumerate(self.JITTER_BINS_MS):
+                if jitter_ms < bound:
+                    self.histogram[k] += 1
+                    break
+            else:
+                self.histogram[-1] += 1
+            if self._last_start is not None:
+                interval = start - self._last_start
+                self.interval_total += interval
+                self.interval_max = max(self.interval_max, interval)
+            self._last_start = start
+        return start
+
+    def end(self, start: float):
+        """标记本周期执行结束，推进截止时间"""
+        now = time.monotonic()
+        with self._lock:
+            elapsed = now - start
+            self.runs += 1
+            self.exec_last = elapsed
+            self.exec_total += elapsed
+            self.exec_max = max(self.exec_max, elapsed)
+            deadline = (self._deadline if self._deadline is not None else self.next_deadline) + self.period
+            if now > deadline:
+                self.overruns += 1
+                missed = int((now - deadline) // self.period) + 1
+                self.skipped += missed
+                deadline += missed * self.period
+            self.next_deadline = deadline
+
+    def run_once(self, *args, **kwargs):
+        start = self.begin()
+        try:
+            return self.func(*args, **kwargs)
+        finally:
+            self.end(start)
+
+    def loop(self, running: threading.Event):
+        """在当前线程中按周期执行 func，直到 running 被清除"""
+        self.next_deadline = time.monotonic()
+        while self.wait(running):
+            self.run_once()
+
+    def get_stats(self):
+        """周期、执行时间、超时次数和启动延迟直方图（毫秒）"""
+        with self._lock:
+            runs = self.runs
+            labels = ["<{}ms".format(b) for b in self.JITTER_BINS_MS] + [">={}ms".format(self.JITTER_BINS_MS[-1])]
+            return {
+                "period_ms": round(self.period * 1000, 3),
+                "runs": runs,
+                "overruns": self.overruns,
+                "skipped": self.skipped,
+                "exec_ms": {
+                    "last": round(self.exec_last * 1000, 3),
+                    "mean": round(self.exec_total / runs * 1000, 3) if runs else None,
+                    "max": round(self.exec_max * 1000, 3),
+                },
+                "actual_period_ms": {
+                    "mean": round(self.interval_total / (runs - 1) * 1000, 3) if runs > 1 else None,
+                    "max": round(self.interval_max * 1000, 3),
+                },
+                "jitter_max_ms": round(self.jitter_max * 1000, 3),
+                "jitter_histogram": dict(zip(labels, self.histogram)),
+            }
+
+
+class Scheduler:
+    """
+    周期任务登记处：各硬件线程的 PeriodicTask 在这里注册，统一查询周期统计
+    （只做统计，不驱动任务——任务由各自所属的线程执行，避免同一串口被两个线程访问）
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tasks = {}
+
+    def register(self, task: PeriodicTask):
+        """注册任务，同名任务被替换"""
+        with self._lock:
+            self.tasks[task.name] = task
+
+    def get_stats(self):
+        """{任务名: 统计}"""
+        with self._lock:
+            tasks = list(self.tasks.values())
+        return {task.name: task.get_stats() for task in tasks}
+
+
+# 默认登记处：servo / touch / grasper 的周期任务都注册在这里
+scheduler = Scheduler()
@@ -0,0 +1,114 @@
+import time
+from typing import Callable, List, Optional
+
+
+class FrameReader:
+    """
+    带长度字段的串口帧读取器
+
+    按 帧头 -> 长度字段 -> 整帧 的顺序从串口取数，收齐一帧立即返回，
+    不再固定 sleep 后 read_all；多读到的字节留在缓冲区给下一帧使用。
+    """
+
+    def __init__(self, ser, head: bytes, header_len: int,
+                 frame_length: Callable[[bytearray], int],
+                 tail: bytes = b"",
+                 validate: Optional[Callable[[bytes], bool]] = None,
+                 poll_interval: float = 0.0005,
+                 max_frame_len: Optional[int] = None):
+        """
+        参数:
+            ser: 已打开的串口对象
+            head: 帧头字节
+            header_len: 计算整帧长度所需的最少字节数（含帧头）
+            frame_length: 根据前 header_len 个字节返回整帧长度
+            tail: 帧尾字节（可选），不匹配时重新同步
+            validate: 整帧校验函数（可选），返回 False 时丢弃并重新同步
+            poll_interval: 串口暂无数据时的轮询间隔
+            max_frame_len: 整帧长度上限（可选），长度字段超过上限视为误码，跳过该帧头重新同步
+        """
+        self.ser = ser
+        self.head = head
+        self.header_len = header_len
+        self.frame_length = frame_length
+        self.tail = tail
+        self.validate = validate
+        self.poll_interval = poll_interval
+        self.max_frame_len = max_frame_len
+        self.buffer = bytearray()
+
+    def clear(self):
+        """清空残留字节（重连后调用）"""
+        self.buffer.clear()
+
+    def _pop_frame(self) -> Optional[bytes]:
+        """从缓冲区取出一帧完整数据，不够一帧时返回 None"""
+        buf = self.buffer
+        while True:
+            start = buf.find(self.head)
+            if start < 0:
+                # 保留可能是帧头前半部分的尾巴
+                keep = len(self.head) - 1
+                if len(buf) > keep:
+                    del buf[:len(buf) - keep]
+                return None
+            if start:
+                del buf[:start]
+            if len(buf) < self.header_len:
+                return None
+            frame_len = self.frame_length(buf)
+            if frame_len < self.header_len or \
+                    (self.max_frame_len is not None and frame_len > self.max_frame_len):
+                # 长度字段不合理（误码），跳过这个帧头，避免等待一个永远收不齐的长帧
+                del buf[:1]
+                continue
+            if len(buf) < frame_len:
+                return None
+            frame = bytes(buf[:frame_len])
+            if (self.tail and not frame.endswith(self.tail)) or \
+                    (self.validate is not None and not self.validate(frame)):
+                # 帧尾/校验不对，跳过这个帧头继续找
+                del buf[:1]
+                continue
+            del buf[:frame_len]
+            return frame
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """追加已收到的字节，返回其中所有完整帧（供非阻塞 / 异步读取使用）"""
+        self.buffer += data
+        frames = []
+        frame = self._pop_frame()
+        while frame is not None:
+            frames.append(frame)
+            frame = self._pop_frame()
+        return frames
+
+    def read_frame(self, timeout: float) -> Optional[bytes]:
+        """
+        读取一帧，收齐即返回
+
+        参数:
+            timeout: 最长等待时间（秒）
+
+        返回:
+            完整帧字节，超时返回 None（未凑齐的字节保留在缓冲区）
+        """
+        return self.read_frame_until(time.monotonic() + timeout)
+
+    def read_frame_until(self, deadline: float) -> Optional[bytes]:
+        """与 read_frame 相同，但使用 time.monotonic() 的绝对截止时间"""
+        frame = self._pop_frame()
+        while frame is None:
+            waiting = self.ser.in_waiting
+            if waiting:
+                self.buffer += self.ser.read(waiting)
+                frame = self._pop_frame()
+                continue
+            if time.monotonic() >= deadline:
+                if self.buffer.startswith(self.head):
+                    # 超时仍有未收齐的帧：可能是长度字段误码，跳过这个帧头重新同步
+                    del self.buffer[:1]
+                    return self._pop_frame()
+                return None
+            time.sleep(self.poll_interval)
+        return frame
@@ -2,7 +2,116 @@ import serial
 import struct
 import time
 import threading
-class ServoActuator:
+import heapq
+import itertools
+from collections.abc import Mapping
+from backend.serial_frame import FrameReader
+from backend.snapshot import Snapshot, SnapshotPublisher
+from backend.health import HealthTracker
+from backend.fault_manager import FaultManager
+from backend.scheduler import PeriodicTask
+
+
+class JointStatus:
+    """单个电缸的状态（读状态应答帧解析结果），兼容按键名取值 status['current_position']"""
+
+    __slots__ = ("id", "cmd", "target_position", "current_position", "current_current_mA",
+                 "force_g", "force_adc_raw", "temperature_C", "error_code", "timestamp")
+
+    # 从 ID 字节开始：ID(1B) + 指令类型(1B) + 保留(2B) + 目标位置(h) + 实际位置(h)
+    # + 实际电流(H) + 力传感器数值(h) + 力传感器原始值(H) + 温度(b) + 故障码(B)
+    STRUCT = struct.Struct("<BB2xhhHhHbB")
+    OFFSET = 3
+
+    def __init__(self, id, cmd, target_position, current_position, current_current_mA,
+                 force_g, force_adc_raw, temperature_C, error_code, timestamp=None):
+        self.id = id
+        self.cmd = cmd
+        self.target_position = target_position
+        self.current_position = current_position
+        self.current_current_mA = current_current_mA
+        self.force_g = force_g
+        self.force_adc_raw = force_adc_raw
+        self.temperature_C = temperature_C
+        self.error_code = error_code
+        self.timestamp = timestamp  # 采集时刻 time.monotonic()
+
+    @classmethod
+    def from_frame(cls, frame, timestamp=None):
+        return cls(*cls.STRUCT.unpack_from(memoryview(frame), cls.OFFSET), timestamp)
+
+    def __getitem__(self, key):
+        if key == "cmd":
+            return f"0x{self.cmd:02X}"
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def to_dict(self):
+        """与旧版 _parse_status_frame 返回的字典格式一致"""
+        return {key: self[key] for key in self.__slots__}
+
+    def __repr__(self):
+        return f"JointStatus({self.to_dict()})"
+
+
+class JointStatusView(Mapping):
+    """
+    关节状态元组的只读字典视图 {id: 状态字典}
+    尚无任何关节数据时为空，供 /status 等旧接口使用
+    """
+
+    def __init__(self, joints, ids):
+        self._joints = joints
+        self._ids = ids
+
+    def _value(self, status):
+        return status.to_dict() if status is not None else None
+
+    def __getitem__(self, id_addr):
+        if id_addr not in self._ids or not len(self):
+            raise KeyError(id_addr)
+        return self._value(self._joints[id_addr - 1])
+
+    def __iter__(self):
+        return iter(self._ids if len(self) else ())
+
+    def __len__(self):
+        return len(self._ids) if any(status is not None for status in self._joints) else 0
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class JointPositionView(JointStatusView):
+    """关节实际位置的只读字典视图 {id: current_position}"""
+
+    def _value(self, status):
+        return status.current_position if status is not None else None
+
+
+class BusRequest:
+    """
+    提交给总线线程的一条指令，执行完成后通过 done 通知调用方
+    batch 为 True 时 cmd_bytes 是多帧指令列表，一次写出后按 ID 收集应答
+    cancelled 为 True 表示调用方已超时放弃，总线线程取出后直接丢弃
+    """
+
+    __slots__ = ("cmd_bytes", "priority", "batch", "enqueued", "done", "result", "cancelled")
+
+    def __init__(self, cmd_bytes, priority: int, batch: bool = False):
+        self.cmd_bytes = cmd_bytes
+        self.priority = priority
+        self.batch = batch
+        self.enqueued = time.monotonic()
+        self.done = threading.Event()
+        self.result = b''
+        self.cancelled = False
+
+
+class ServoProtocol:
+    """电缸总线协议：指令帧构建、应答帧拆分与解析，同步 / 异步驱动共用"""
+
     FRAME_HEAD_CMD = b'\x55\xAA'
     FRAME_HEAD_ACK = b'\xAA\x55'
 
@@ -10,44 +119,27 @@ class ServoActuator:
     CMD_RD_REGISTER = 0x31
     CMD_WR_REGISTER = 0x32
 
-    def __init__(self, port="/dev/ttyUSB0", baudrate=921600, timeout=0.1):
-        self.port = port
-        self.baudrate = baudrate
-        self.timeout = timeout
-        self.ser = serial.Serial(port, baudrate, timeout=timeout)
-        self.positions = {}
-        self.info = {}
-        self.error_code = {}
-        self._running = threading.Event()  # 正确的运行标志
-        self._thread = None
-        self.lock = threading.RLock()
-    def close(self):
-        if self.ser and self.ser.is_open:
-            self.ser.close()
-    def run(self):
-        while self._running.is_set():
-            time.sleep(0.1)
-            self.get_positions()
-            # print("-")
-        else:
-            time.sleep(0.1)
-    def start_thread(self):
-        if self._thread is None or not self._thread.is_alive():
-            self._running.set()
-            self._thread = threading.Thread(target=self.run, daemon=True)
-            self._thread.start()
+    ACK_OVERHEAD = 5  # 帧头(2B) + 数据长度(1B) + ID(1B) + 校验(1B)，整帧长度 = L + 5
+    JOINT_IDS = (1, 2, 3, 4, 5, 6)
 
-    def stop_thread(self):
-        self._running.clear()  # 通知线程退出
-        # 避免线程在自己里面 join 自己
-        if self._thread is not None and threading.current_thread() != self._thread:
-            self._thread.join()
-        self._thread = None
+    # 配置类寄存器（set_speed / set_mode / set_voltage / set_pos_with_vel 写入的地址）
+    CONFIG_REGISTERS = {"speed": 0x23, "mode": 0x25, "voltage": 0x26, "velocity": 0x28, "position": 0x29}
+    SETPOINT_REGISTERS = (0x25, 0x29)  # 设定帧写入的寄存器段：模式 ... 目标速度、目标位置
+
+    def _make_reader(self, ser) -> FrameReader:
+        """按 AA 55 L 帧头和长度字节拆分应答帧，校验和不对的丢弃"""
+        return FrameReader(
+            ser, self.FRAME_HEAD_ACK, 3,
+            lambda head: head[2] + self.ACK_OVERHEAD,
+            validate=lambda frame: self.checksum(frame[2:-1]) == frame[-1],
+            max_frame_len=0xFF + self.ACK_OVERHEAD,
+        )
 
     @staticmethod
     def checksum(data: bytes) -> int:
         """计算校验和（除帧头外）"""
         return sum(data) & 0xFF
+
     def _build_cmd(self, cmd: int, reg_addr=None, values=None, id_addr=None):
         # 优先使用调用时指定的id_addr，否则用默认id_addr
         if id_addr is None:
@@ -90,18 +182,6 @@ class ServoActuator:
         else:
             raise ValueError("未知指令类型")
 
-    def _send_cmd(self, cmd_bytes: bytes):
-        with self.lock:
-            self.ser.write(cmd_bytes)
-            time.sleep(0.01)  # 文档建议 ≥1ms
-            return self.ser.read_all()
-
-    def read_status(self,id_addr=None):
-        """读取电缸状态"""
-        cmd = self._build_cmd(self.CMD_RD_STATUS,id_addr=id_addr)
-        resp = self._send_cmd(cmd)
-        return self._parse_status_frame(resp)
-
     def _parse_status_frame(self, frame: bytes):
         """解析读状态应答帧"""
         if frame is None:
@@ -109,36 +189,353 @@ class ServoActuator:
             return None
         if not frame.startswith(self.FRAME_HEAD_ACK):
             return None
-        if len(frame) < 20:  # 应答帧至少要够
+        if len(frame) < JointStatus.OFFSET + JointStatus.STRUCT.size + 1:  # 应答帧至少要够
             return None
         # 帧结构参考文档：
         # 帧头(2B) + 数据长度(1B) + ID(1B) + 指令类型(1B) + 保留(1B) + 保留(1B)
         # 目标位置(2B, 有符号) + 实际位置(2B, 有符号) + 实际电流(2B, 无符号)
         # 力传感器数值(2B, 有符号) + 力传感器原始值(2B, 无符号)
         # 温度(1B, 有符号) + 故障码(1B, 无符号) + 校验(1B)
-        # print(frame)
-        # 提取字段
-        id_addr = frame[3]
-        cmd = f"0x{frame[4]:02X}"  # 十六进制格式
-        target_position = struct.unpack("<h", frame[7:9])[0]
-        current_position = struct.unpack("<h", frame[9:11])[0]
-        current_current = struct.unpack("<H", frame[11:13])[0]
-        force_sensor = struct.unpack("<h", frame[13:15])[0]
-        force_adc = struct.unpack("<H", frame[15:17])[0]
-        temperature = struct.unpack("<b", frame[17:18])[0]
-        error_code = struct.unpack("<B", frame[18:19])[0]
-
-        return {
-            "id": id_addr,
-            "cmd": cmd,
-            "target_position": target_position,
-            "current_position": current_position,
-            "current_current_mA": current_current,
-            "force_g": force_sensor,
-            "force_adc_raw": force_adc,
-            "temperature_C": temperature,
-            "error_code": error_code
-        }
+        return JointStatus.from_frame(frame, time.monotonic())
+
+    def _parse_register_frame(self, frame: bytes, count: int):
+        """
+        解析读寄存器应答帧，返回 count 个 16 位无符号寄存器值（小端）
+        帧结构：帧头(2B) + 数据长度(1B) + ID(1B) + 指令类型(1B) + 起始地址(2B) + 数据(2B*n) + 校验(1B)
+        """
+        if not frame or len(frame) < 8 or frame[4] != self.CMD_RD_REGISTER:
+            return None
+        data = frame[7:frame[2] + 4]
+        if len(data) < count * 2:
+            return None
+        return list(struct.unpack_from("<%dH" % count, data))
+
+
+class ServoActuator(ServoProtocol):
+
+    # 指令优先级（数值小的先执行）：安全指令可在帧间隙插队到轮询和设定值之前
+    PRIO_SAFETY = 0     # 暂停 / 停止 / 清除故障
+    PRIO_SETPOINT = 1   # 位置、速度、模式等设定
+    PRIO_POLL = 2       # 状态轮询
+    PRIORITY_NAMES = {PRIO_SAFETY: "safety", PRIO_SETPOINT: "setpoint", PRIO_POLL: "poll"}
+
+    MAX_VELOCITY = 500   # 同步运动时各关节默认速度上限（步/s）
+    MIN_VELOCITY = 10    # 行程很短的关节也至少以此速度运动
+    RESET_POSE = {1: 100, 2: 100, 3: 217, 4: 100, 5: 1700, 6: 1300}
+
+    def __init__(self, port="/dev/ttyUSB0", baudrate=921600, timeout=0.1, pipelined=True, batch_timeout=0.02,
+                 reply_timeout=0.01, poll_budget=0.03, poll_interval=0.1, coalesce=True):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.pipelined = pipelined          # True: 一次性下发所有读状态帧，再按 ID 拆分应答
+        self.batch_timeout = batch_timeout  # 流水线轮询等待全部应答的最长时间
+        self.reply_timeout = reply_timeout  # 单条指令等待应答的最长时间（收齐即返回）
+        self.poll_budget = poll_budget      # 一次轮询（含重试）的总时间预算
+        self.poll_interval = poll_interval  # 后台线程的状态轮询周期
+        self.coalesce = coalesce            # True: 后台线程运行时，位置设定只保留每个关节的最新目标
+        self.ser = serial.Serial(port, baudrate, timeout=timeout)
+        self.reader = self._make_reader(self.ser)
+        # 状态快照：data 为按 ID 顺序排列的 JointStatus 元组
+        self._state = SnapshotPublisher((None,) * len(self.JOINT_IDS))
+        self._status_cmds = {i: self._build_cmd(self.CMD_RD_STATUS, id_addr=i) for i in self.JOINT_IDS}
+        # 关节在线状态：连续无应答的 ID 降为慢速探测
+        self.joint_health = {i: HealthTracker(fail_threshold=2, base_backoff=0.5, max_backoff=2.0)
+                             for i in self.JOINT_IDS}
+        self.poll_report = {"duration": None, "skipped": [], "offline": []}
+        # 故障管理：按状态流跟踪各关节故障，只清除故障关节
+        self.faults = FaultManager(self.JOINT_IDS)
+        self.error_code = self.faults.error_code
+        self._running = threading.Event()  # 正确的运行标志
+        self._thread = None
+        self.poll_task = PeriodicTask("servo_poll", poll_interval, self.get_positions)
+        self.lock = threading.RLock()       # 多步操作之间的互斥（如 set_hand_pos_with_vel）
+        self._bus_lock = threading.Lock()   # 单次串口收发的互斥
+        # 优先级指令队列：后台线程运行时，其他线程的指令都经由队列在帧间隙执行
+        self._queue = []
+        self._queue_cond = threading.Condition()
+        self._queue_seq = itertools.count()
+        self.queue_stats = {prio: {"count": 0, "total_wait": 0.0, "max_wait": 0.0, "cancelled": 0}
+                            for prio in self.PRIORITY_NAMES}
+        # 位置设定信箱：{id: (position, velocity)}，每个周期由后台线程统一下发
+        self._setpoints = {}
+        self._acked = {}  # 已被电缸应答的最近一次设定 {id: (position, velocity)}
+        self.setpoint_stats = {"submitted": 0, "sent": 0, "coalesced": 0, "skipped": 0}
+        # 寄存器缓存 {id: {addr: value}}：写寄存器时按地址范围失效；
+        # _reg_gen 每次失效加一，读取期间发生过写入的结果不写回缓存
+        self._reg_cache = {i: {} for i in self.JOINT_IDS}
+        self._reg_gen = {i: 0 for i in self.JOINT_IDS}
+        self._reg_lock = threading.Lock()
+        self.register_stats = {"hits": 0, "misses": 0, "invalidated": 0}
+    def get_snapshot(self) -> Snapshot:
+        """最新一次完整轮询的状态快照（seq, timestamp, JointStatus 元组）"""
+        return self._state.current
+
+    @property
+    def info(self):
+        """{id: 状态字典}，兼容旧版 self.info"""
+        return JointStatusView(self._state.current.data, self.JOINT_IDS)
+
+    @property
+    def positions(self):
+        """{id: 实际位置}，兼容旧版 self.positions"""
+        return JointPositionView(self._state.current.data, self.JOINT_IDS)
+
+    def oldest_sample(self, ids=None):
+        """ids 中最旧一次状态采集的时刻（time.monotonic()），有关节从未读到时返回 None"""
+        joints = self._state.current.data
+        ids = self.JOINT_IDS if ids is None else ids
+        stamps = [joints[i - 1].timestamp if joints[i - 1] is not None else None for i in ids]
+        if not stamps or None in stamps:
+            return None
+        return min(stamps)
+
+    def get_joint_ages(self, now=None):
+        """{id: 状态数据年龄（毫秒）}，从未读到的为 None"""
+        now = time.monotonic() if now is None else now
+        return {i: None if status is None else round((now - status.timestamp) * 1000, 1)
+                for i, status in zip(self.JOINT_IDS, self._state.current.data)}
+
+    def close(self):
+        if self.ser and self.ser.is_open:
+            self.ser.close()
+    def run(self):
+        """总线线程：按优先级执行队列中的指令，按绝对截止时间轮询关节状态"""
+        task = self.poll_task
+        task.next_deadline = time.monotonic()
+        while self._running.is_set():
+            self._drain_queue()
+            self._flush_setpoints()
+            if task.due():
+                task.run_once()
+                continue
+            with self._queue_cond:
+                if not self._queue and not self._setpoints:
+                    self._queue_cond.wait(task.time_until())
+        # 退出前执行完剩余指令，避免调用方一直等待
+        self._drain_queue()
+        self._flush_setpoints()
+
+    def _drain_queue(self, max_priority=None):
+        """按优先级逐条执行队列中的指令；max_priority 限定只执行该优先级及更高的指令"""
+        while True:
+            with self._queue_cond:
+                if not self._queue or (max_priority is not None and self._queue[0][0] > max_priority):
+                    return
+                _, _, request = heapq.heappop(self._queue)
+                if request.cancelled:
+                    # 调用方已超时放弃，不再写到总线上
+                    self.queue_stats[request.priority]["cancelled"] += 1
+                    continue
+            wait = time.monotonic() - request.enqueued
+            stats = self.queue_stats[request.priority]
+            stats["count"] += 1
+            stats["total_wait"] += wait
+            stats["max_wait"] = max(stats["max_wait"], wait)
+            try:
+                if request.batch:
+                    request.result = self._transact_batch(request.cmd_bytes)
+                else:
+                    request.result = self._transact(request.cmd_bytes)
+            finally:
+                request.done.set()
+
+    def _service_safety(self):
+        """帧间隙插入：先执行排队中的安全指令"""
+        if self._thread is not None and threading.current_thread() is self._thread:
+            self._drain_queue(self.PRIO_SAFETY)
+
+    def _flush_setpoints(self):
+        """下发信箱中每个关节的最新目标，与上次已应答目标相同的跳过"""
+        with self._queue_cond:
+            if not self._setpoints:
+                return
+            setpoints, self._setpoints = self._setpoints, {}
+        self._check_faults()
+        for id_addr, target in setpoints.items():
+            self._service_safety()
+            if self._acked.get(id_addr) == target:
+                self.setpoint_stats["skipped"] += 1
+                continue
+            self._write_setpoint(target[0], target[1], id_addr)
+
+    def _write_setpoint(self, position, velocity, id_addr):
+        """写入 0x25 起的 模式 + 速度 + 位置，应答成功后记为已确认目标"""
+        cmd = self._build_cmd(self.CMD_WR_REGISTER, 0x25, [0X0002,0X0000,0X0000, velocity,position], id_addr=id_addr)
+        result = self._send_cmd(cmd)
+        self.setpoint_stats["sent"] += 1
+        if result:
+            self._acked[id_addr] = (position, velocity)
+        return result
+
+    def _check_faults(self):
+        """只清除有故障的关节，同一关节按最小间隔限速"""
+        now = time.monotonic()
+        for id_addr in self.faults.due_for_clear(now):
+            self.clear_fault(id_addr)
+            self.faults.mark_cleared(id_addr, now)
+
+    def get_fault_report(self):
+        """各关节故障码、故障 / 清除次数和最近的故障记录"""
+        return self.faults.report()
+
+    def get_setpoint_stats(self):
+        """位置设定的提交 / 实际下发 / 被合并 / 重复跳过次数"""
+        return dict(self.setpoint_stats)
+
+    def get_queue_stats(self):
+        """各优先级指令的排队等待时间统计（毫秒），以及调用方超时后被丢弃的指令数"""
+        result = {}
+        for prio, stats in self.queue_stats.items():
+            count = stats["count"]
+            result[self.PRIORITY_NAMES[prio]] = {
+                "count": count,
+                "avg_wait_ms": round(stats["total_wait"] / count * 1000, 3) if count else None,
+                "max_wait_ms": round(stats["max_wait"] * 1000, 3) if count else None,
+                "cancelled": stats["cancelled"],
+            }
+        return result
+    def start_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._running.set()
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+
+    def stop_thread(self):
+        self._running.clear()  # 通知线程退出
+        # 避免线程在自己里面 join 自己
+        if self._thread is not None and threading.current_thread() != self._thread:
+            self._thread.join()
+        self._thread = None
+
+    def _send_cmd(self, cmd_bytes: bytes, priority: int = PRIO_SETPOINT):
+        """
+        发送一帧指令，返回同 ID、同指令类型的应答帧（超时返回 b''）
+        后台线程运行时经由优先级队列执行，否则直接收发
+        """
+        thread = self._thread
+        if thread is None or not thread.is_alive() or threading.current_thread() is thread:
+            return self._transact(cmd_bytes)
+        return self._submit(BusRequest(cmd_bytes, priority))
+
+    def _send_batch(self, cmds, priority: int = PRIO_SETPOINT):
+        """一次写出多帧指令（每个 ID 一帧），返回 {id: 应答帧}，线程规则同 _send_cmd"""
+        thread = self._thread
+        if thread is None or not thread.is_alive() or threading.current_thread() is thread:
+            return self._transact_batch(cmds)
+        return self._submit(BusRequest(list(cmds), priority, batch=True)) or {}
+
+    def _submit(self, request: BusRequest):
+        with self._queue_cond:
+            heapq.heappush(self._queue, (request.priority, next(self._queue_seq), request))
+            self._queue_cond.notify()
+        if not request.done.wait(1.0):
+            with self._queue_cond:
+                # 仍在队列中的指令作废，避免调用方放弃后才被写到总线上
+                request.cancelled = not request.done.is_set()
+            print("[WARN] bus request timed out, priority:", self.PRIORITY_NAMES[request.priority])
+        return request.result
+
+    @staticmethod
+    def _write_span(cmd_bytes: bytes):
+        """写寄存器指令帧的 (id, 起始地址, 寄存器数)"""
+        return cmd_bytes[3], cmd_bytes[5] | cmd_bytes[6] << 8, (cmd_bytes[2] - 3) // 2
+
+    def _before_write(self, cmd_bytes: bytes):
+        """
+        写寄存器前的簿记：作废被覆盖的寄存器缓存；
+        写到设定帧覆盖的寄存器段（模式 / 速度 / 位置）后，之后同样的设定需要重新下发
+        """
+        id_addr, reg_addr, count = self._write_span(cmd_bytes)
+        if reg_addr <= self.SETPOINT_REGISTERS[-1] and reg_addr + count > self.SETPOINT_REGISTERS[0]:
+            self._acked.pop(id_addr, None)
+        self._invalidate_registers(id_addr, reg_addr, count)
+
+    def _after_write(self, cmd_bytes: bytes):
+        """写寄存器得到应答后，把写入的值记入寄存器缓存（如 set_mode 之后可直接从缓存得知当前模式）"""
+        id_addr, reg_addr, count = self._write_span(cmd_bytes)
+        cache = self._reg_cache.get(id_addr)
+        if cache is None:
+            return
+        values = [cmd_bytes[7 + 2 * k] | cmd_bytes[8 + 2 * k] << 8 for k in range(count)]
+        with self._reg_lock:
+            cache.update(zip(range(reg_addr, reg_addr + count), values))
+
+    def _transact(self, cmd_bytes: bytes):
+        """在总线上完成一次收发"""
+        id_addr, cmd = cmd_bytes[3], cmd_bytes[4]
+        if cmd == self.CMD_WR_REGISTER:
+            self._before_write(cmd_bytes)
+        with self._bus_lock:
+            self.ser.write(cmd_bytes)
+            deadline = time.monotonic() + self.reply_timeout
+            while True:
+                frame = self.reader.read_frame_until(deadline)
+                if frame is None:
+                    return b''
+                if frame[3] == id_addr and frame[4] == cmd:
+                    if cmd == self.CMD_WR_REGISTER:
+                        self._after_write(cmd_bytes)
+                    return frame
+
+    # ---------------- 寄存器读取与缓存 ----------------
+    def _invalidate_registers(self, id_addr, reg_addr, count):
+        cache = self._reg_cache.get(id_addr)
+        if cache is None:
+            return
+        with self._reg_lock:
+            self._reg_gen[id_addr] += 1
+            for addr in range(reg_addr, reg_addr + count):
+                if cache.pop(addr, None) is not None:
+                    self.register_stats["invalidated"] += 1
+
+    def read_registers(self, id_addr, reg_addr: int, count: int = 1, use_cache=True):
+        """
+        读取 id_addr 从 reg_addr 开始的 count 个寄存器（16 位，小端）
+
+        参数:
+            use_cache: True 时全部命中缓存则不访问总线
+        返回:
+            寄存器值列表，无应答返回 None
+        """
+        cache = self._reg_cache.get(id_addr)
+        addrs = range(reg_addr, reg_addr + count)
+        with self._reg_lock:
+            if use_cache and cache is not None and all(a in cache for a in addrs):
+                self.register_stats["hits"] += 1
+                return [cache[a] for a in addrs]
+            self.register_stats["misses"] += 1
+            gen = self._reg_gen.get(id_addr)
+        cmd = self._build_cmd(self.CMD_RD_REGISTER, reg_addr, count, id_addr=id_addr)
+        values = self._parse_register_frame(self._send_cmd(cmd, self.PRIO_POLL), count)
+        if values is not None and cache is not None:
+            with self._reg_lock:
+                if self._reg_gen[id_addr] == gen:
+                    cache.update(zip(addrs, values))
+        return values
+
+    def read_config(self, id_addr, use_cache=True):
+        """一次读出 CONFIG_REGISTERS 覆盖的整段寄存器，返回 {名称: 值}，无应答返回 None"""
+        start = min(self.CONFIG_REGISTERS.values())
+        count = max(self.CONFIG_REGISTERS.values()) - start + 1
+        values = self.read_registers(id_addr, start, count, use_cache)
+        if values is None:
+            return None
+        return {name: values[addr - start] for name, addr in self.CONFIG_REGISTERS.items()}
+
+    def dump_config(self, ids=None, use_cache=True):
+        """所有关节的配置寄存器 {id: {名称: 值} 或 None}，运动中优先走缓存"""
+        ids = self.JOINT_IDS if ids is None else ids
+        return {i: self.read_config(i, use_cache) for i in ids}
+
+    def get_register_stats(self):
+        return dict(self.register_stats)
+
+    def read_status(self,id_addr=None):
+        """读取电缸状态"""
+        cmd = self._build_cmd(self.CMD_RD_STATUS,id_addr=id_addr)
+        resp = self._send_cmd(cmd, self.PRIO_POLL)
+        return self._parse_status_frame(resp)
 
     # ---------------- 常用指令封装 ----------------
     def set_mode(self, mode: int, id_addr=None):
@@ -152,20 +549,23 @@ class ServoActuator:
             print(cmd.hex())
             return self._send_cmd(cmd)
     def set_pos_with_vel(self,position:int,velocity:int,id_addr=None):
-        """设置目标位置和速度（步）"""
+        """
+        设置目标位置和速度（步）
+        后台线程运行时放入信箱立即返回，同一关节未下发的旧目标被新目标覆盖
+        """
+        thread = self._thread
+        if self.coalesce and thread is not None and thread.is_alive() and threading.current_thread() is not thread:
+            with self._queue_cond:
+                self.setpoint_stats["submitted"] += 1
+                if id_addr in self._setpoints:
+                    self.setpoint_stats["coalesced"] += 1
+                self._setpoints[id_addr] = (position, velocity)
+                self._queue_cond.notify()
+            return None
         with self.lock:
-            if self.info != {}:
-                for i in self.info.keys():
-                    self.error_code[i] = self.info[i]['error_code'] if self.info[i]['error_code'] != 0 else 0
-            if all(value == 0 for value in self.error_code.values()):
-                cmd = self._build_cmd(self.CMD_WR_REGISTER, 0x25, [0X0002,0X0000,0X0000, velocity,position], id_addr=id_addr)
-                result = self._send_cmd(cmd)
-            else:
-                self.clear_fault()
-                cmd = self._build_cmd(self.CMD_WR_REGISTER, 0x25, [0X0002,0X0000,0X0000, velocity,position], id_addr=id_addr)
-                result = self._send_cmd(cmd)
-            # print(cmd.hex())
-            return result
+            self.setpoint_stats["submitted"] += 1
+            self._check_faults()
+            return self._write_setpoint(position, velocity, id_addr)
     def set_hand_pos_with_vel(self,position:int,velocity:int):
         """设置目标位置和速度（步）"""
         with self.lock:
@@ -174,6 +574,60 @@ class ServoActuator:
                     print("[WARN] Motor {} has no position data, skipping...".format(i))
                     return
                 self.set_pos_with_vel(value,velocity,i)
+    def plan_sync_move(self, targets, max_velocity=None):
+        """
+        规划同步运动：按最新实际位置计算各关节行程，行程最长（相对速度上限）的关节
+        以上限速度运动，其余关节按比例降速，使所有关节同时到达
+
+        参数:
+            targets: {id: 目标位置}
+            max_velocity: 速度上限，int 对所有关节生效，或 {id: 上限}；默认 MAX_VELOCITY
+        返回:
+            ({id: (位置, 速度)}, 预计用时秒数)；当前位置未知的关节按上限速度运动
+        """
+        if max_velocity is None:
+            max_velocity = self.MAX_VELOCITY
+        limits = max_velocity if isinstance(max_velocity, dict) else {i: max_velocity for i in targets}
+        positions = self.positions
+        travel = {}
+        for id_addr, target in targets.items():
+            current = positions.get(id_addr)  # 尚未轮询到或离线的关节为 None
+            travel[id_addr] = None if current is None else abs(target - current)
+        duration = max([d / limits[i] for i, d in travel.items() if d is not None] or [0.0])
+        plan = {}
+        for id_addr, target in targets.items():
+            if travel[id_addr] is None or duration <= 0:
+                velocity = limits[id_addr]
+            else:
+                velocity = max(self.MIN_VELOCITY, min(limits[id_addr], round(travel[id_addr] / duration)))
+            plan[id_addr] = (int(target), int(velocity))
+        return plan, duration
+
+    def move_hand_sync(self, targets, max_velocity=None):
+        """
+        同步运动到目标姿态：规划各关节速度后在一次批量写中下发
+
+        返回:
+            预计用时（秒）
+        """
+        plan, duration = self.plan_sync_move(targets, max_velocity)
+        with self._queue_cond:
+            # 信箱中这些关节尚未下发的旧目标作废
+            for id_addr in plan:
+                self._setpoints.pop(id_addr, None)
+            self.setpoint_stats["submitted"] += len(plan)
+        with self.lock:
+            self._check_faults()
+            replies = self.write_registers_batch(
+                0x25, {i: [0x0002, 0x0000, 0x0000, vel, pos] for i, (pos, vel) in plan.items()})
+        self.setpoint_stats["sent"] += len(plan)
+        for id_addr in replies:
+            self._acked[id_addr] = plan[id_addr]
+        missing = [i for i in plan if i not in replies]
+        if missing:
+            print("[WARN] no ack for synchronized move on joints", missing)
+        return duration
+
     def set_position(self, position: int, id_addr=None):
         """设置目标位置（步）"""
         with self.lock:
@@ -194,47 +648,157 @@ class ServoActuator:
         return self._send_cmd(cmd)
 
     def clear_fault(self, id_addr=None):
-        """清除故障"""
-        with self.lock:
-            for i in range(1, 7):
-                cmd = self._build_cmd(self.CMD_WR_REGISTER, 0x18, [1], id_addr=i)
-                self._send_cmd(cmd)
+        """
+        清除故障（安全指令，优先执行；不占用 self.lock，避免排在普通指令之后）
+        id_addr 为 None 时清除所有关节
+        """
+        ids = self.JOINT_IDS if id_addr is None else (id_addr,)
+        for i in ids:
+            cmd = self._build_cmd(self.CMD_WR_REGISTER, 0x18, [1], id_addr=i)
+            self._send_cmd(cmd, self.PRIO_SAFETY)
 
     def pause_motion(self, id_addr=None):
-        """暂停运动"""
-        with self.lock:
-            cmd = self._build_cmd(self.CMD_WR_REGISTER, 0x1A, [1], id_addr=id_addr)
-            return self._send_cmd(cmd)
-    def send_data_to_get_status(self, id_addr, retries=3):
+        """暂停运动（安全指令，优先执行），id_addr 为 None 时暂停所有关节"""
+        ids = self.JOINT_IDS if id_addr is None else (id_addr,)
+        result = None
+        for i in ids:
+            cmd = self._build_cmd(self.CMD_WR_REGISTER, 0x1A, [1], id_addr=i)
+            result = self._send_cmd(cmd, self.PRIO_SAFETY)
+        return result
+    def send_data_to_get_status(self, id_addr, retries=3, deadline=None):
+        """读取单个电缸状态，失败重试，超过 deadline（time.monotonic()）不再重试"""
         for _ in range(retries):
-            cmd = self._build_cmd(self.CMD_RD_STATUS, id_addr=id_addr)
-            resp = self._send_cmd(cmd)
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            resp = self._send_cmd(self._status_cmds[id_addr], self.PRIO_POLL)
             if resp:
                 return resp
-            time.sleep(0.01)
         return None
 
+    def _transact_batch(self, cmds, timeout=None):
+        """
+        流水线收发：连续写出全部指令帧（每个 ID 一帧），再按 ID 拆分应答
+        返回 {id: 应答帧}，未应答的 ID 不在结果中
+        """
+        timeout = self.batch_timeout if timeout is None else timeout
+        expected = {}
+        for cmd_bytes in cmds:
+            if cmd_bytes[4] == self.CMD_WR_REGISTER:
+                self._before_write(cmd_bytes)
+            expected[cmd_bytes[3]] = cmd_bytes[4]
+        replies = {}
+        with self._bus_lock:
+            self.ser.write(b"".join(cmds))
+            deadline = time.monotonic() + timeout
+            while expected:
+                frame = self.reader.read_frame_until(deadline)
+                if frame is None:
+                    break
+                id_addr = frame[3]
+                if expected.get(id_addr) == frame[4]:
+                    replies[id_addr] = frame
+                    del expected[id_addr]
+        for cmd_bytes in cmds:
+            if cmd_bytes[4] == self.CMD_WR_REGISTER and cmd_bytes[3] in replies:
+                self._after_write(cmd_bytes)
+        return replies
+
+    def read_status_batch(self, ids=None, timeout=None):
+        """
+        流水线读取多个电缸状态：连续写出全部读状态帧，再按 ID 拆分应答
+        返回 {id: 应答帧}，未应答的 ID 不在结果中
+        """
+        ids = self.JOINT_IDS if ids is None else ids
+        return self._transact_batch([self._status_cmds[i] for i in ids], timeout)
+
+    def write_registers_batch(self, reg_addr: int, values_by_id, priority: int = PRIO_SETPOINT):
+        """
+        在一次总线收发中给多个关节写同一段寄存器
+
+        参数:
+            reg_addr: 起始寄存器地址
+            values_by_id: {id: [寄存器值, ...]}
+        返回:
+            {id: 应答帧}，未应答的 ID 不在结果中
+        """
+        cmds = [self._build_cmd(self.CMD_WR_REGISTER, reg_addr, list(values), id_addr=i)
+                for i, values in values_by_id.items()]
+        return self._send_batch(cmds, priority)
+
     def get_positions(self):
-        positions = []
-        for id_addr in range(1, 7):
-            
-            resp = self.send_data_to_get_status(id_addr=id_addr)
-            status = self._parse_status_frame(resp)
+        """
+        在时间预算内轮询各关节，发布新的状态快照，返回实际位置列表
+        离线关节按退避间隔探测；因预算用完未读取的关节沿用上一次的状态
+        """
+        start = time.monotonic()
+        deadline = start + self.poll_budget
+        ids = [i for i in self.JOINT_IDS if self.joint_health[i].due(start)]
+        if self.pipelined:
+            replies, attempted = self._poll_pipelined(ids, deadline)
+        else:
+            replies, attempted = self._poll_sequential(ids, deadline)
+
+        now = time.monotonic()
+        previous = self._state.current.data
+        joints = []
+        skipped, offline = [], []
+        for id_addr in self.JOINT_IDS:
+            health = self.joint_health[id_addr]
+            status = self._parse_status_frame(replies[id_addr]) if id_addr in replies else None
             if status:
-                self.positions[id_addr] = status['current_position']
-                self.info[id_addr] = status
-                positions.append(status['current_position'])
+                health.record_ok()
+                acked = self._acked.get(id_addr)
+                if acked is not None and status.target_position != acked[0]:
+                    # 电缸目标已被其他途径改变，下次相同设定需重新下发
+                    self._acked.pop(id_addr, None)
+            elif id_addr in attempted:
+                health.record_failure(now)
+            elif id_addr in ids:
+                skipped.append(id_addr)  # 预算用完
+                status = previous[id_addr - 1]
             else:
-                self.positions[id_addr] = None
-                self.info[id_addr] = None
-                positions.append(None)
-        return positions
+                health.skipped += 1      # 离线退避中
+            if not health.healthy:
+                offline.append(id_addr)
+            joints.append(status)
+        self.poll_report = {"duration": now - start, "skipped": skipped, "offline": offline}
+        self.faults.update(joints)
+        self._state.publish(tuple(joints))
+        return [status.current_position if status else None for status in joints]
+
+    def get_poll_report(self):
+        """最近一次轮询的耗时、因预算跳过的 ID、离线 ID 以及各关节在线统计"""
+        report = dict(self.poll_report)
+        report["health"] = {i: health.as_dict() for i, health in self.joint_health.items()}
+        return report
+
+    def _poll_sequential(self, ids, deadline):
+        replies, attempted = {}, set()
+        for id_addr in ids:
+            self._service_safety()
+            if time.monotonic() >= deadline:
+                break
+            attempted.add(id_addr)
+            resp = self.send_data_to_get_status(id_addr=id_addr, deadline=deadline)
+            if resp:
+                replies[id_addr] = resp
+        return replies, attempted
+
+    def _poll_pipelined(self, ids, deadline):
+        if not ids:
+            return {}, set()
+        replies = self.read_status_batch(ids, min(self.batch_timeout, deadline - time.monotonic()))
+        missing = [i for i in ids if i not in replies]
+        self._service_safety()
+        if missing and time.monotonic() < deadline:
+            # 预算内对未应答的 ID 再补读一次
+            replies.update(self.read_status_batch(missing, min(self.batch_timeout, deadline - time.monotonic())))
+        return replies, set(ids)
+
     def reset_grasp(self):
-        for i in range(1, 5):
-            self.set_pos_with_vel(100,500, i)
-        self.set_pos_with_vel(1700,500, 5)
-        self.set_pos_with_vel(1300,500, 6)
-        self.set_pos_with_vel(217,500, 3)
+        """所有关节同时回到张开姿态"""
+        return self.move_hand_sync(self.RESET_POSE, self.MAX_VELOCITY)
+
 if __name__ == "__main__":
     actuator = ServoActuator("/dev/ttyUSB0", 921600)
     actuator.start_thread()
@@ -0,0 +1,38 @@
+import threading
+import time
+from collections import namedtuple
+
+# 一次完整采集周期的只读快照
+#   seq: 单调递增的序号（0 表示还没有数据）
+#   timestamp: 发布时刻 time.monotonic()
+#   data: 本周期数据，发布后不再修改
+Snapshot = namedtuple("Snapshot", ["seq", "timestamp", "data"])
+
+
+class SnapshotPublisher:
+    """
+    双缓冲快照发布器
+
+    采集线程每个周期构建一份新数据，通过一次引用赋值替换 current，
+    读取方拿到的总是某个完整周期的数据，无需加锁或拷贝字典。
+    """
+
+    def __init__(self, empty_data):
+        self._lock = threading.Lock()  # 只在多个写入方之间互斥，读取不加锁
+        self._published = threading.Condition(self._lock)
+        self.current = Snapshot(0, 0.0, empty_data)
+
+    def publish(self, data) -> Snapshot:
+        """发布新一帧数据，唤醒等待新帧的线程，返回新快照"""
+        with self._lock:
+            snapshot = Snapshot(self.current.seq + 1, time.monotonic(), data)
+            self.current = snapshot
+            self._published.notify_all()
+        return snapshot
+
+    def wait_newer(self, seq: int, timeout: float = None):
+        """阻塞直到出现序号大于 seq 的快照，超时返回 None"""
+        with self._lock:
+            if self._published.wait_for(lambda: self.current.seq > seq, timeout):
+                return self.current
+        return None
@@ -0,0 +1,78 @@
+from collections import namedtuple
+
+import numpy as np
+
+# 一帧触觉特征（每个数组第一维为传感器，顺序与输入一致；无分布力数据时相应项为 NaN）
+#   centroid: 接触中心 (x, y)，单位 mm，以阵列中心为原点
+#   area: 接触面积 mm^2（超过 contact_threshold 的触点数 * 单个触点面积）
+#   peak: 触点最大值
+#   shear_ratio: 切向力 / 法向力 = hypot(fx, fy) / fz
+#   stable: 切向力比不超过 max_shear_ratio（未打滑）
+TactileFeatures = namedtuple("TactileFeatures", ["centroid", "area", "peak", "shear_ratio", "stable"])
+
+
+class TactileAnalyzer:
+    """
+    触觉特征的向量化计算
+
+    预先生成触点坐标网格，每帧对所有传感器一次性计算接触中心、接触面积、
+    峰值压力和切向力比，不逐个传感器循环。
+    """
+
+    def __init__(self, pitch=(2.0, 2.0), contact_threshold: float = 10, max_shear_ratio: float = np.inf):
+        """
+        参数:
+            pitch: 触点间距 (x, y)，单位 mm
+            contact_threshold: 触点值超过该阈值才计入接触
+            max_shear_ratio: 切向力比上限（摩擦锥），超过视为打滑 / 擦碰；合力原始值未标定前默认不限制
+        """
+        self.pitch = pitch
+        self.contact_threshold = contact_threshold
+        self.max_shear_ratio = max_shear_ratio
+        self.taxel_area = pitch[0] * pitch[1]
+        self.shape = None
+        self._grid_x = None
+        self._grid_y = None
+
+    def _build_grid(self, shape):
+        """触点中心坐标网格（以阵列中心为原点），首次遇到某种阵列形状时生成"""
+        rows, cols = shape
+        x = (np.arange(cols) - (cols - 1) / 2) * self.pitch[0]
+        y = (np.arange(rows) - (rows - 1) / 2) * self.pitch[1]
+        self._grid_x, self._grid_y = np.meshgrid(x, y)
+        self.shape = tuple(shape)
+
+    def shear_ratio(self, forces: np.ndarray) -> np.ndarray:
+        """forces: [传感器, 3] 三轴合力，法向力为 0 时切向力比为 inf（无切向力时为 0）"""
+        tangential = np.hypot(forces[:, 0], forces[:, 1])
+        normal = np.abs(forces[:, 2])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(normal > 0, tangential / normal, np.where(tangential > 0, np.inf, 0.0))
+        return ratio
+
+    def analyze(self, forces: np.ndarray, taxels: np.ndarray = None) -> TactileFeatures:
+        """
+        参数:
+            forces: [传感器, 3] 三轴合力
+            taxels: [传感器, 行, 列] 分布力数据，None 时只计算切向力比
+        """
+        n = len(forces)
+        ratio = self.shear_ratio(forces)
+        stable = ratio <= self.max_shear_ratio
+        if taxels is None:
+            nan = np.full(n, np.nan)
+            return TactileFeatures(np.full((n, 2), np.nan), nan, nan.copy(), ratio, stable)
+
+        if self.shape != taxels.shape[1:]:
+            self._build_grid(taxels.shape[1:])
+        pressure = taxels.astype(np.float32)
+        weights = np.where(pressure > self.contact_threshold, pressure, 0.0)
+        count = np.count_nonzero(weights, axis=(1, 2))
+        total = weights.sum(axis=(1, 2))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cx = np.einsum("nij,ij->n", weights, self._grid_x) / total
+            cy = np.einsum("nij,ij->n", weights, self._grid_y) / total
+        centroid = np.stack([cx, cy], axis=1)  # 无接触时为 NaN
+        area = count * self.taxel_area
+        peak = pressure.max(axis=(1, 2))
+        return TactileFeatures(centroid, area, peak, ratio, stable)
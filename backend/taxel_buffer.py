@@ -0,0 +1,78 @@
+import threading
+
+import numpy as np
+
+
+class TaxelRing:
+    """
+    分布力（触点阵列）帧的预分配环形缓冲
+
+    采集线程把每个端口的原始载荷用 np.frombuffer 直接解码进 latest 中该传感器的槽位，
+    一个扫描周期结束后 commit() 把整帧拷入环形缓冲；读取方拿到的是拷贝，不受后续写入影响。
+    """
+
+    def __init__(self, sensor_ids, shape, capacity: int = 64, dtype=np.uint8):
+        """
+        参数:
+            sensor_ids: 本缓冲包含的传感器编号
+            shape: 每个传感器的触点阵列形状 (行, 列)
+            capacity: 保留的帧数
+            dtype: 每个触点的数据类型（载荷中每个触点占 dtype.itemsize 字节）
+        """
+        self.sensor_ids = tuple(sensor_ids)
+        self.index = {sensor_id: k for k, sensor_id in enumerate(self.sensor_ids)}
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.size = int(np.prod(self.shape))
+        self.nbytes = self.size * self.dtype.itemsize
+        self.capacity = capacity
+        n = len(self.sensor_ids)
+        self.latest = np.zeros((n,) + self.shape, dtype=self.dtype)
+        self.latest_stamp = np.full(n, np.nan)
+        self.frames = np.zeros((capacity, n) + self.shape, dtype=self.dtype)
+        self.stamps = np.full((capacity, n), np.nan)
+        self.count = 0  # 已提交的帧数（最新帧序号）
+        self._lock = threading.Lock()
+
+    def decode(self, sensor_id: int, payload, timestamp: float, offset: int = 0) -> bool:
+        """把一个端口的原始载荷解码进该传感器的槽位，长度不足时返回 False"""
+        if len(payload) - offset < self.nbytes:
+            return False
+        values = np.frombuffer(payload, dtype=self.dtype, count=self.size, offset=offset)
+        k = self.index[sensor_id]
+        self.latest[k].reshape(-1)[:] = values
+        self.latest_stamp[k] = timestamp
+        return True
+
+    def commit(self) -> int:
+        """一个扫描周期结束：把当前各传感器数据作为一帧写入环形缓冲，返回帧序号"""
+        with self._lock:
+            slot = self.count % self.capacity
+            self.frames[slot] = self.latest
+            self.stamps[slot] = self.latest_stamp
+            self.count += 1
+            return self.count
+
+    def latest_frame(self):
+        """
+        返回:
+            (帧序号, 各传感器采样时刻, 触点数据拷贝)；尚无数据时为 (0, None, None)
+        """
+        with self._lock:
+            if not self.count:
+                return 0, None, None
+            slot = (self.count - 1) % self.capacity
+            return self.count, self.stamps[slot].copy(), self.frames[slot].copy()
+
+    def history(self, n: int = None):
+        """
+        最近 n 帧（按时间先后）
+
+        返回:
+            (采样时刻 [帧, 传感器], 触点数据 [帧, 传感器, 行, 列])
+        """
+        with self._lock:
+            available = min(self.count, self.capacity)
+            n = available if n is None else min(n, available)
+            slots = np.arange(self.count - n, self.count) % self.capacity
+            return self.stamps[slots].copy(), self.frames[slots].copy()
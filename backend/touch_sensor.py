@@ -5,6 +5,14 @@ import logging
 from typing import List, Optional, Dict, Any
 import threading
 from collections import deque
+from types import MappingProxyType
+from backend.serial_frame import FrameReader
+from backend.snapshot import Snapshot, SnapshotPublisher
+from backend.health import HealthTracker
+from backend.scheduler import PeriodicTask
+from backend.link_supervisor import LinkSupervisor
+from backend.taxel_buffer import TaxelRing
+from backend.force_filter import ForceFilterBank
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -15,10 +23,66 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class SensorCommunication:
-    """传感器通信类，封装与力传感器设备的串口通信功能"""
-    
-    def __init__(self, port: str = None, baudrate: int = 460800, timeout: float = 0.2):
+
+def _oldest_sample(data, sensor_ids):
+    """data 中 sensor_ids 最旧一次成功采样的时刻，有传感器从未采到时返回 None"""
+    stamps = [data[i].get("timestamp") if i in data else None for i in sensor_ids]
+    if not stamps or None in stamps:
+        return None
+    return min(stamps)
+
+
+def _sample_ages(data, sensor_ids, now):
+    """{传感器编号: 数据年龄（毫秒）}，从未采到的为 None"""
+    ages = {}
+    for i in sensor_ids:
+        stamp = data[i].get("timestamp") if i in data else None
+        ages[i] = None if stamp is None else round((now - stamp) * 1000, 1)
+    return ages
+
+
+class TouchBoxLink:
+    """单个触觉控制盒的串口链路：独立的扫描线程、端口映射、健康统计和重连监管"""
+
+    FRAME_HEAD = b'\x55\xAA\x7B\x7B'
+    FRAME_TAIL = b'\x55\xAA\x7D\x7D'
+    # 应答帧：帧头(4B) + 5B + Error(1B) + Length(2B, 小端) + Data + LRC(1B) + 帧尾(4B)
+    FRAME_HEADER_LEN = 12
+    FRAME_OVERHEAD = 17
+
+    # 选择端口命令体，最后一个字节：指尖 = 3*(端口号-1)，指腹 = 指尖 + 1
+    PORT_SELECT_BODY = b'\x0E\x00\x70\xB1\x0A\x01\x00'
+    PORT_IDS = range(1, 11)
+    # 命令配置：命令体, 解析方式, 描述
+    COMMANDS = {
+        "get_version": (bytes.fromhex("0E 00 60 A0 01 00 00"), "ascii", "获取版本号"),
+        "recalibration": (bytes.fromhex("0E 00 70 B0 02 02 00 03 01"), "text", "重新校准"),
+        "set_mode": (bytes.fromhex("0E 00 70 C0 0C 01 00 05"), "", "设置模式"),
+        "get_mode": (bytes.fromhex("0E 00 70 C0 0D 00 00 B5"), "text", "获取模式"),
+        "get_data": (bytes.fromhex("0E 00 70 C0 06 05 00 7B 0E 04"), "hex", "获取CN1数据"),    # 分布力
+        "get_force": (bytes.fromhex("0E 00 70 C0 06 05 00 7B F0 03"), "hex", "获取合力数据"),  # 合力
+    }
+    # 需要附加请求长度的命令
+    DATA_COMMANDS = ("get_data", "get_force")
+    # 数据命令应答中，数据域前 6 字节为命令回显，触点 / 合力数据从整帧第 18 字节开始
+    PAYLOAD_OFFSET = FRAME_HEADER_LEN + 6
+    # 非数据命令（版本号、模式等）应答数据域的长度上限
+    TEXT_REPLY_MAX = 64
+    # 传感器编号 -> (物理端口, 是否指尖)
+    FORCE_MAP = {
+        1: (1, True),
+        2: (3, False),
+        3: (5, True),
+        4: (6, False),
+        5: (7, False),
+        6: (9, True),
+        7: (10, True),
+    }
+
+    def __init__(self, port: str = None, baudrate: int = 460800, timeout: float = 0.2,
+                 request_lengths=(3,), scan_interval: float = 0.02,
+                 force_map: Dict[int, tuple] = None, name: str = "touch", on_publish=None,
+                 taxel_shape=None, taxel_capacity: int = 64, filter_kind: str = "mean", filter_window: int = 3):
         """
         初始化传感器通信类
         
@@ -26,33 +90,87 @@ class SensorCommunication:
             port: 串口号，如'COM8'
             baudrate: 波特率
             timeout: 串口超时时间
+            request_lengths: 预先生成数据命令帧的请求长度
+            scan_interval: 扫描周期（秒），按绝对截止时间调度
+            force_map: 本控制盒的 传感器编号 -> (物理端口, 是否指尖)，默认 FORCE_MAP
+            name: 控制盒名称（调度统计、日志中使用）
+            on_publish: 每个扫描周期发布数据后的回调 on_publish(self)
+            taxel_shape: 分布力触点阵列形状 (行, 列)，需与控制盒配置一致；
+                给出时每次读取合力后再用 get_data 读取整块触点数据（每触点 1 字节）
+            taxel_capacity: 分布力环形缓冲保留的帧数
+            filter_kind / filter_window: 三轴力默认滤波方式和窗口（默认最近 3 帧平均），
+                可用 set_filter 按传感器单独修改
         """
         logger.setLevel(logging.WARNING)  # 只显示 WARNING 及以上级别
-        self.force_history = {i: deque(maxlen=3) for i in range(1, 8)}  # 1~7端口，每个保存10帧
+        self.name = name
+        self.on_publish = on_publish
+        self.force_map = dict(self.FORCE_MAP if force_map is None else force_map)
+        self.filters = ForceFilterBank(self.force_map, window=filter_window, kind=filter_kind)
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
         self.ser = None
+        self.reader = None
         self.connected = False
         self.current_port = None
-        self.error_code = {1: None, 2: None, 3: None, 4: None, 5: None, 6: None,7:None}
-        self.force_data = {}
+        self.error_code = {port_id: None for port_id, _ in self.force_map.values()}  # 物理端口 -> 错误码
+        # 力数据快照：data 为 {传感器编号: {"force": [fx, fy, fz], "type": ...}}
+        self._state = SnapshotPublisher(MappingProxyType({}))
         self._running = threading.Event()  # 正确的运行标志
         self._thread = None
+        self.scan_task = PeriodicTask(f"{name}_scan", scan_interval, self.get_all_force)
+        # 链路监管：收发出错时立即降级，由后台线程重连，读取方拿到带 stale 标记的旧数据
+        self.link = LinkSupervisor(self._reconnect_once, name=name)
         self.lock = threading.RLock()
+        # 扫描调度：每个传感器每隔 period 个扫描周期读取一次，priority 大的先读
+        self.scan_periods = {i: 1 for i in self.force_map}
+        self.scan_priority = {i: 0 for i in self.force_map}
+        self._scan_cycle = 0
+        self._next_scan = {i: 0 for i in self.force_map}
+        self._sample_times = {i: deque(maxlen=20) for i in self.force_map}
+        self.port_health = {i: HealthTracker() for i in self.force_map}
+        # 分布力采集：触点数据直接解码进预分配数组，每个扫描周期提交一帧
+        self.taxels = None
+        if taxel_shape is not None:
+            self.taxels = TaxelRing(self.force_map, taxel_shape, taxel_capacity)
+            request_lengths = tuple(request_lengths) + (self.taxels.nbytes,)
+        # 应答帧长度上限：超过的长度字段视为误码，FrameReader 丢弃该帧头重新同步
+        self.max_frame_len = self.FRAME_OVERHEAD + max(
+            self.PAYLOAD_OFFSET - self.FRAME_HEADER_LEN + max(request_lengths, default=0), self.TEXT_REPLY_MAX)
+        # 预先生成的二进制命令帧（只读），发送时直接写出
+        self.port_frames = self._build_port_frames()
+        self.command_frames = self._build_command_frames(request_lengths)
         if port is not None:
             self.connect_port(port)
             self.init_box()
         else:
             self.connect_port(self.find_acm_ports())
-    def run(self):
-        while self._running.is_set():
-            start = time.time()
-            self.get_all_force()
-            end = time.time()
-            # print(self.force_data,end-start)
+        if not self.connected:
+            self.link.report_lost("初始连接失败")
+    @property
+    def force_data(self):
+        """最新一次完整扫描的力数据（只读），兼容旧版 self.force_data"""
+        return self._state.current.data
+
+    def get_snapshot(self) -> Snapshot:
+        """最新一次完整扫描的力数据快照（seq, timestamp, data）"""
+        return self._state.current
+
+    def wait_for_frame(self, last_seq: int = 0, timeout: float = None) -> Optional[Snapshot]:
+        """
+        阻塞等待新的力数据帧
+
+        参数:
+            last_seq: 调用方已处理的最新帧序号
+            timeout: 最长等待时间（秒），None 为一直等待
 
-            time.sleep(0.01)
+        返回:
+            序号大于 last_seq 的快照，超时返回 None
+        """
+        return self._state.wait_newer(last_seq, timeout)
+
+    def run(self):
+        self.scan_task.loop(self._running)
     def check_connection(self) -> bool:
         """
         检查当前串口连接是否正常
@@ -68,42 +186,50 @@ class SensorCommunication:
         # print([p.device for p in ports if "ACM" in p.device])
         return [p.device for p in ports if "ACM" in p.device]
 
-    def reconnect(self, retries: int = 3, delay: float = 2.0) -> bool:
+    def reconnect(self, wait: float = 0.0) -> bool:
         """
-        尝试重新连接串口
+        请求后台重连（不阻塞调用方）
+
+        参数:
+            wait: 最长等待重连完成的时间（秒），0 为立即返回
+        返回:
+            当前链路是否已连接
         """
-        logger.warning("检测到串口断开，开始尝试重连...")
-        self.stop_thread()
+        self.link.report_lost("请求重连")
+        deadline = time.monotonic() + wait
+        while not self.link.connected and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return self.link.connected
+
+    def _link_lost(self, error):
+        """收发出错：标记断开并交给监管线程重连，调用方立即返回"""
+        self.connected = False
+        self.current_port = None
+        self.link.report_lost(error)
+
+    def _reconnect_once(self) -> bool:
+        """监管线程中尝试重连一次：优先原串口，再尝试其他 ACM 串口"""
         if self.ser:
             try:
-                self.disconnect()
-                print("已断开串口连接")
-
+                self.ser.close()
             except Exception:
                 pass
             self.ser = None
-        time.sleep(1)
-        acm_ports = self.find_acm_ports()
-        if acm_ports == []:
+        self.connected = False
+        candidates = [self.port] if self.port else []
+        candidates += [p for p in self.find_acm_ports() if p not in candidates]
+        if not candidates:
             logger.error("未检测到任何 ACM 串口")
-            return self.reconnect()
-        for port in acm_ports:
-            for attempt in range(1, retries + 1):
-                try:
-                    logger.warning(f"第 {attempt} 次重连 {port}...")
-                    if self.connect(port):
-                        if self.init_box():
-                            logger.warning("串口重连成功")
-                            self.start_thread()
-                            return True
-                except Exception as e:
-                    logger.error(f"重连失败: {e}")
-                time.sleep(delay)
-
-            logger.error("重连失败，已放弃")
             return False
+        for port in candidates:
+            if self.connect(port) and self.init_box():
+                self.current_port = None
+                return True
+            self.connected = False
+        return False
 
     def start_thread(self):
+        self.link.start_thread()
         if self._thread is None or not self._thread.is_alive():
             self._running.set()
             self._thread = threading.Thread(target=self.run, daemon=True)
@@ -115,6 +241,7 @@ class SensorCommunication:
         if self._thread is not None and threading.current_thread() != self._thread:
             self._thread.join()
         self._thread = None
+        self.link.stop_thread()
 
     def list_available_ports(self) -> List[Dict[str, str]]:
         """获取所有可用串口信息"""
@@ -151,6 +278,12 @@ class SensorCommunication:
                 logger.error("未指定串口号")
                 return False
             self.ser = serial.Serial(self.port, self.baudrate, timeout=self.timeout)
+            self.reader = FrameReader(
+                self.ser, self.FRAME_HEAD, self.FRAME_HEADER_LEN,
+                lambda head: self.FRAME_OVERHEAD + int.from_bytes(head[10:12], byteorder='little'),
+                tail=self.FRAME_TAIL,
+                max_frame_len=self.max_frame_len,
+            )
             if self.ser.is_open:
                 self.connected = True
                 logger.info(f"成功连接到串口: {self.port}")
@@ -180,6 +313,20 @@ class SensorCommunication:
         参数:
             hex_data: 16进制字符串，如"55 AA 7B 7B"
             
+        返回:
+            发送是否成功
+        """
+        # 移除空格并转换为字节
+        clean_hex = hex_data.replace(' ', '').upper()
+        return self.send_bytes(bytes.fromhex(clean_hex))
+
+    def send_bytes(self, data_bytes: bytes) -> bool:
+        """
+        直接发送二进制帧到串口
+
+        参数:
+            data_bytes: 完整命令帧
+
         返回:
             发送是否成功
         """
@@ -188,18 +335,11 @@ class SensorCommunication:
             return False
         with self.lock:
             try:
-                # 移除空格并转换为字节
-                clean_hex = hex_data.replace(' ', '').upper()
-                data_bytes = bytes.fromhex(clean_hex)
                 self.ser.write(data_bytes)
-                logger.debug(f"已发送16进制数据: {hex_data}")
                 return True
             except Exception as e:
                 logger.error(f"发送数据时出错: {str(e)}")
-                self.reconnect()
-                if self.check_connection():
-                    self.ser.write(data_bytes)
-                    return True
+                self._link_lost(e)
                 return False
     
     def read_serial_response(self, timeout: float = 0.02) -> Optional[bytes]:
@@ -207,25 +347,25 @@ class SensorCommunication:
         从串口读取回复数据
         
         参数:
-            timeout: 读取超时时间
+            timeout: 最长等待时间，收齐一帧立即返回
             
         返回:
-            读取到的数据字节，若无数据则返回None
+            读取到的完整帧字节，若超时则返回None
         """
         if not self.connected:
             logger.error("未连接到串口，无法读取数据")
             return None
         with self.lock:
             try:
-                # 等待数据到达
-                time.sleep(timeout)
-                response = self.ser.read_all()
+                response = self.reader.read_frame(timeout)
                 if response:
                     logger.debug(f"收到回复数据: {response.hex(' ')}")
                     return response
                 return None
             except Exception as e:
                 logger.error(f"读取数据时出错: {str(e)}")
+                if isinstance(e, (serial.SerialException, OSError)):
+                    self._link_lost(e)
                 return None
     
     @staticmethod
@@ -245,6 +385,36 @@ class SensorCommunication:
         lrc = ((~lrc) + 1) & 0xFF  # 取反加一
         logger.debug(f"LRC校验码计算结果: {lrc:02X}")
         return lrc
+
+    def _build_frame(self, body: bytes) -> bytes:
+        """帧头 + 命令体 + LRC + 帧尾"""
+        return self.FRAME_HEAD + body + bytes([self.calculate_lrc(body)]) + self.FRAME_TAIL
+
+    def _build_port_frames(self):
+        """生成所有端口（指尖/指腹）的选择命令帧"""
+        frames = {}
+        for port_id in self.PORT_IDS:
+            tip_code = 3 * (port_id - 1)
+            frames[(port_id, True)] = self._build_frame(self.PORT_SELECT_BODY + bytes([tip_code]))
+            frames[(port_id, False)] = self._build_frame(self.PORT_SELECT_BODY + bytes([(tip_code + 1) & 0xFF]))
+        return MappingProxyType(frames)
+
+    def _build_data_frame(self, fun: str, length: int) -> bytes:
+        body = self.COMMANDS[fun][0]
+        if fun in self.DATA_COMMANDS and length > 0:
+            # 长度为小端字节序，追加到命令体后
+            body = body + length.to_bytes(2, byteorder='little')
+        return self._build_frame(body)
+
+    def _build_command_frames(self, request_lengths):
+        """生成所有命令帧，数据命令按每个请求长度各生成一帧，键为 (命令, 长度)"""
+        frames = {}
+        for fun in self.COMMANDS:
+            frames[(fun, 0)] = self._build_data_frame(fun, 0)
+            if fun in self.DATA_COMMANDS:
+                for length in request_lengths:
+                    frames[(fun, length)] = self._build_data_frame(fun, length)
+        return MappingProxyType(frames)
     
     def select_port(self, port_id: int, tip: bool = True) -> bool:
         """
@@ -263,50 +433,16 @@ class SensorCommunication:
 
         # 如果已经选择了该端口，并且 tip 状态一致，则无需重复选择
         if self.current_port == (port_id, tip):
-            logger.info(f"已选择端口{port_id} ({'指尖' if tip else '指腹'})，无需重复选择")
+            logger.info("已选择端口%s (%s)，无需重复选择", port_id, '指尖' if tip else '指腹')
             return True
 
-        # 选择端口的命令配置
-        port_commands = {
-            1: {"command": "choose_port1", "body": "0E 00 70 B1 0A 01 00 00", "sleep": 1},
-            2: {"command": "choose_port2", "body": "0E 00 70 B1 0A 01 00 03", "sleep": 1},
-            3: {"command": "choose_port3", "body": "0E 00 70 B1 0A 01 00 06", "sleep": 1},
-            4: {"command": "choose_port4", "body": "0E 00 70 B1 0A 01 00 09", "sleep": 1},
-            5: {"command": "choose_port5", "body": "0E 00 70 B1 0A 01 00 0C", "sleep": 1},
-            6: {"command": "choose_port6", "body": "0E 00 70 B1 0A 01 00 0F", "sleep": 1},
-            7: {"command": "choose_port7", "body": "0E 00 70 B1 0A 01 00 12", "sleep": 1},
-            8: {"command": "choose_port8", "body": "0E 00 70 B1 0A 01 00 15", "sleep": 1},
-            9: {"command": "choose_port9", "body": "0E 00 70 B1 0A 01 00 18", "sleep": 1},
-            10: {"command": "choose_port10", "body": "0E 00 70 B1 0A 01 00 1B", "sleep": 1},
-        }
-
-        if port_id not in port_commands:
+        frame = self.port_frames.get((port_id, tip))
+        if frame is None:
             logger.error(f"无效的端口ID: {port_id}")
             return False
 
-        cmd = port_commands[port_id]
-        head = "55 AA 7B 7B"
-        body = cmd["body"]
-
-        # 如果是指腹，把最后一个字节 +1
-        if not tip:
-            parts = body.split()
-            last_val = int(parts[-1], 16)
-            parts[-1] = f"{(last_val + 1) & 0xFF:02X}"  # 防止溢出超过 0xFF
-            body = " ".join(parts)
-        sleep_time = cmd["sleep"]
-
-        # 计算LRC校验码
-        data_bytes = bytes.fromhex(body.replace(' ', ''))
-        lrc = self.calculate_lrc(data_bytes)
-        tail = "55 AA 7D 7D"
-
-        # 构建完整发送数据
-        full_hex_data = f"{head} {body} {lrc:02X} {tail}"
-        logger.info(f"选择端口{port_id} ({'指尖' if tip else '指腹'}): {full_hex_data}")
-
         # 发送选择端口命令
-        if not self.send_hex_data(full_hex_data):
+        if not self.send_bytes(frame):
             return False
 
         # 读取响应（可选）
@@ -314,13 +450,13 @@ class SensorCommunication:
         if response:
             if len(response) >= 16 and response[9] == 0x00:
                 self.current_port = (port_id, tip)
-                logger.info(f"成功选择端口{port_id} ({'指尖' if tip else '指腹'})")
+                logger.info("成功选择端口%s (%s)", port_id, '指尖' if tip else '指腹')
                 return True
             else:
                 logger.warning(f"选择端口{port_id} ({'指尖' if tip else '指腹'}) 可能失败，响应: {response.hex(' ')}")
 
         self.current_port = (port_id, tip)
-        logger.info(f"已发送端口{port_id} ({'指尖' if tip else '指腹'}) 选择命令，等待确认")
+        logger.info("已发送端口%s (%s) 选择命令，等待确认", port_id, '指尖' if tip else '指腹')
         return True
 
     def get_ser_response(self, fun: str, length: int = 0) -> Optional[str]:
@@ -338,75 +474,18 @@ class SensorCommunication:
             logger.error("未连接到串口，无法执行命令")
             return None
             
-        # 命令配置字典，避免大量if-else
-        commands = {
-            "get_version": {
-                "body": "0E 00 60 A0 01 00 00",
-                "sleep": 1,
-                "parse": "ascii",
-                "description": "获取版本号"
-            },
-            "recalibration": {
-                "body": "0E 00 70 B0 02 02 00 03 01",
-                "sleep": 1,
-                "parse": "text",
-                "description": "重新校准"
-            },
-            "set_mode": {
-                "body": "0E 00 70 C0 0C 01 00 05",
-                "sleep": 1,
-                "parse": "",
-                "description": "设置模式"
-            },
-            "get_mode": {
-                "body": "0E 00 70 C0 0D 00 00 B5",
-                "sleep": 1,
-                "parse": "text",
-                "description": "获取模式"
-            },
-            "get_data": {
-                "body": "0E 00 70 C0 06 05 00 7B 0E 04",    #分布力
-                "sleep": 0.05,
-                "parse": "hex",
-                "description": "获取CN1数据"
-            },
-            "get_force": {
-                "body": "0E 00 70 C0 06 05 00 7B F0 03",    #合力
-                "sleep": 0.05,
-                "parse": "hex",
-                "description": "获取合力数据"
-            }
-        }
-        
-        if fun not in commands:
+        if fun not in self.COMMANDS:
             logger.error(f"不支持的命令: {fun}")
             return None
-            
-        cmd = commands[fun]
-        head = "55 AA 7B 7B"
-        body = cmd["body"]
-        sleep_time = cmd["sleep"]
-        parse_type = cmd["parse"]
-        logger.info(f"执行命令: {fun} - {cmd['description']}")
-        
-        # 处理需要长度参数的命令
-        if fun in ["get_data", "get_force"] and length > 0:
-            # 将长度转为小端字节序并添加到body
-            length_bytes = length.to_bytes(2, byteorder='little')
-            body = f"{body} {length_bytes.hex()}"
-            logger.debug(f"添加长度参数: {length} 字节, 十六进制: {length_bytes.hex()}")
-        
-        # 计算LRC校验码
-        data_bytes = bytes.fromhex(body.replace(' ', ''))
-        lrc = self.calculate_lrc(data_bytes)
-        tail = "55 AA 7D 7D"
-        
-        # 构建完整发送数据
-        full_hex_data = f"{head} {body} {lrc:02X} {tail}"
-        logger.debug(f"完整发送数据: {full_hex_data}")
-        
+
+        parse_type = self.COMMANDS[fun][1]
+        frame = self.command_frames.get((fun, length if fun in self.DATA_COMMANDS else 0))
+        if frame is None:
+            # 未预先生成的请求长度，临时构建
+            frame = self._build_data_frame(fun, length)
+
         # 发送数据
-        if not self.send_hex_data(full_hex_data):
+        if not self.send_bytes(frame):
             return None
             
         # 等待响应
@@ -422,7 +501,7 @@ class SensorCommunication:
         try:
             if len(response) >= 16:
                 # 检查头和尾
-                if response[0:4] == bytes.fromhex(head.replace(' ', '')) and response[-4:] == bytes.fromhex(tail.replace(' ', '')):
+                if response[0:4] == self.FRAME_HEAD and response[-4:] == self.FRAME_TAIL:
                     # 解析Error域
                     error = response[9]
                     if error == 0x00:
@@ -444,7 +523,7 @@ class SensorCommunication:
                             return result
                         elif parse_type == "hex":
                             result = data.hex()
-                            logger.info(f"0x7b 获取数据: {result}")
+                            logger.debug("0x7b 获取数据: %s", result)
                             return result
                         else:
                             logger.info(f"{fun}: 执行成功")
@@ -508,7 +587,7 @@ class SensorCommunication:
             logger.error(f"选择端口{port_id}失败")
             return None
 
-        logger.info(f"从端口{port_id}获取{request_length}字节数据")
+        logger.info("从端口%s获取%s字节数据", port_id, request_length)
         # 获取原始数据
         data = self.get_ser_response(command, request_length)
         if isinstance(data, dict) and "error" in data:
@@ -534,12 +613,44 @@ class SensorCommunication:
             if isinstance(valid_data, list):
                 valid_data = ''.join(valid_data)  # 把 ['0a','1b'] 转为 "0a1b"
             byte_values = list(bytes.fromhex(valid_data))
-            logger.info(f"成功从端口{port_id}解析{len(byte_values)}个单字节值")
+            logger.info("成功从端口%s解析%s个单字节值", port_id, len(byte_values))
             return byte_values
         except ValueError as e:
             logger.error(f"端口{port_id}十六进制数据解析失败: {str(e)}, 数据: {valid_data}")
             return None
 
+    def read_port_payload(self, port_id: int, command: str, request_length: int, tip=True) -> Optional[memoryview]:
+        """
+        读取端口数据命令的原始载荷，不经过十六进制字符串转换
+
+        返回:
+            应答帧数据域去掉命令回显后的 memoryview，失败返回 None（错误码记入 error_code）
+        """
+        if not self.connected or not self.select_port(port_id, tip):
+            return None
+        frame = self.command_frames.get((command, request_length))
+        if frame is None:
+            frame = self._build_data_frame(command, request_length)
+        if not self.send_bytes(frame):
+            return None
+        response = self.read_serial_response()
+        if not response:
+            return None
+        error = response[9]
+        self.error_code[port_id] = error or None
+        if error:
+            return None
+        data_end = self.FRAME_HEADER_LEN + int.from_bytes(response[10:12], byteorder='little')
+        return memoryview(response)[self.PAYLOAD_OFFSET:data_end]
+
+    def read_taxels(self, sensor_id: int) -> bool:
+        """读取一个传感器的分布力数据并解码进 taxels 缓冲"""
+        port_id, tip = self.force_map[sensor_id]
+        payload = self.read_port_payload(port_id, "get_data", self.taxels.nbytes, tip)
+        if payload is None:
+            return False
+        return self.taxels.decode(sensor_id, payload, time.monotonic())
+
     def convert_hex_to_sensor_data(self, valid_data, axis_types: List[str]) -> Optional[List[int]]:
         """
         将16进制数据按轴类型转换为传感器数值（支持有符号/无符号转换）
@@ -609,51 +720,320 @@ class SensorCommunication:
             return None
             # parsed_force = self.get_force(index)
             # return parsed_force
-    def get_all_force(self):
-        forces = {}
-        force_map = {
-            1:[1,'tip'],
-            2:3,
-            3:[5,'tip'],
-            4:6,
-            5:7,
-            6:[9,'tip'],
-            7:[10,'tip'],
-        }
-        for i in range(1, len(force_map) + 1):
-            fmap = force_map[i]
-
-            sensor_id, sensor_type = None, "default"
-            if isinstance(fmap, list):
-                sensor_id, sensor_type = fmap[0], fmap[1]
-            else:
-                sensor_id = fmap
-            # print("sensor id",sensor_id,sensor_type)
-            if sensor_type == 'tip':
-                force = self.get_force(sensor_id, tip=True)
+    def set_scan_rate(self, sensor_id: int, period: int = 1, priority: int = None):
+        """
+        设置单个传感器的扫描频率
+
+        参数:
+            sensor_id: 传感器编号 (1~7)
+            period: 每隔多少个扫描周期读取一次，1 为每周期都读
+            priority: 同一周期内的读取顺序，数值大的先读
+        """
+        if sensor_id not in self.force_map:
+            logger.error(f"无效的传感器编号: {sensor_id}")
+            return
+        self.scan_periods = {**self.scan_periods, sensor_id: max(1, int(period))}
+        self._next_scan[sensor_id] = min(self._next_scan[sensor_id], self._scan_cycle + self.scan_periods[sensor_id])
+        if priority is not None:
+            self.scan_priority = {**self.scan_priority, sensor_id: priority}
+
+    def set_scan_profile(self, periods: Dict[int, int], priorities: Dict[int, int] = None):
+        """批量设置扫描频率和优先级，未列出的传感器保持不变"""
+        priorities = priorities or {}
+        for sensor_id, period in periods.items():
+            self.set_scan_rate(sensor_id, period, priorities.get(sensor_id))
+
+    def reset_scan_profile(self):
+        """恢复为所有传感器每周期读取"""
+        self.scan_periods = {i: 1 for i in self.force_map}
+        self.scan_priority = {i: 0 for i in self.force_map}
+        self._next_scan = {i: self._scan_cycle for i in self.force_map}
+
+    def set_filter(self, sensor_id: int, kind: str = None, window: int = None, **params):
+        """
+        设置单个传感器的三轴力滤波，修改后该传感器的滤波状态清零
+
+        参数:
+            sensor_id: 传感器编号 (1~7)
+            kind: "mean" / "ema" / "median" / "kalman" / "none"，None 为不修改
+            window: mean / median 的窗口长度
+            params: alpha（ema）、q / r（kalman）
+        """
+        if sensor_id not in self.force_map:
+            logger.error(f"无效的传感器编号: {sensor_id}")
+            return False
+        try:
+            self.filters.configure(sensor_id, kind, window, **params)
+        except (ValueError, TypeError) as e:
+            logger.error(f"滤波设置失败: {e}")
+            return False
+        return True
+
+    def get_sample_rates(self) -> Dict[int, float]:
+        """各传感器最近一段时间的实际采样频率 (Hz)"""
+        rates = {}
+        for i, times in self._sample_times.items():
+            if len(times) >= 2 and times[-1] > times[0]:
+                rates[i] = round((len(times) - 1) / (times[-1] - times[0]), 2)
             else:
-                force = self.get_force(sensor_id, tip=False)
+                rates[i] = 0.0
+        return rates
+
+    def get_port_health(self) -> Dict[int, Dict[str, Any]]:
+        """各传感器端口的健康统计"""
+        health = {}
+        for i, state in self.port_health.items():
+            health[i] = state.as_dict()
+            health[i]["port"] = self.force_map[i][0]
+        return health
+
+    def sensor_error(self, sensor_id: int):
+        """传感器对应物理端口最近一次返回的错误码"""
+        return self.error_code.get(self.force_map[sensor_id][0])
+
+    def oldest_sample(self, sensor_ids=None):
+        """sensor_ids 中最旧一次成功采样的时刻（time.monotonic()），有传感器从未采到时返回 None"""
+        return _oldest_sample(self._state.current.data, self.force_map if sensor_ids is None else sensor_ids)
+
+    def get_sensor_ages(self, now=None):
+        """{传感器编号: 数据年龄（毫秒）}，从未采到的为 None"""
+        now = time.monotonic() if now is None else now
+        return _sample_ages(self._state.current.data, self.force_map, now)
+
+    def _due_sensors(self):
+        """本扫描周期需要读取的传感器，按优先级排序"""
+        cycle = self._scan_cycle
+        due = [i for i in self.force_map if self._next_scan[i] <= cycle]
+        priority = self.scan_priority
+        due.sort(key=lambda i: -priority[i])
+        return due
+
+    def get_all_force(self):
+        previous = self._state.current.data
+        if not self.link.connected:
+            # 降级期间不访问串口，发布带 stale 标记的上一帧数据（时间戳不变）
+            forces = {i: dict(entry, stale=True) for i, entry in previous.items()}
+            self._publish(forces)
+            return forces
+        forces = dict(previous)
+        for i in self._due_sensors():
+            sensor_id, tip = self.force_map[i]
+            sensor_type = 'tip' if tip else 'default'
+            self._next_scan[i] = self._scan_cycle + self.scan_periods[i]
+            health = self.port_health[i]
+            if not health.due(time.monotonic()):
+                # 故障端口退避中，不占用总线时间
+                health.skipped += 1
+                continue
+            force = self.get_force(sensor_id, tip=tip)
 
             if force:
-                # 存入历史队列（超出长度会自动丢弃旧值）
-                self.force_history[i].append(force)
-
-            if self.force_history[i]:
-                # 计算三轴平均
-                summed = [0, 0, 0]
-                for f in self.force_history[i]:
-                    for j in range(3):
-                        summed[j] += f[j]
-                averaged = [round(s / len(self.force_history[i]), 2) for s in summed]
-                forces[i] = {"force": averaged, "type": sensor_type}
+                self.filters.update(i, force)
+                self._sample_times[i].append(time.monotonic())
+                health.record_ok()
+                if self.taxels is not None:
+                    self.read_taxels(i)
             else:
-                forces[i] = {"force": None, "type": sensor_type}
+                health.record_failure(time.monotonic(), self.error_code.get(sensor_id))
 
-            # 更新到 self.force_data
-            self.force_data[i] = forces[i]
+            # timestamp 为最近一次成功采样的时刻，读取失败时不更新，供看门狗判断数据年龄
+            stamp = self._sample_times[i][-1] if self._sample_times[i] else None
+            filtered = self.filters.value(i)
+            if filtered is not None:
+                filtered = [round(v, 2) for v in filtered.tolist()]
+            forces[i] = {"force": filtered, "type": sensor_type, "timestamp": stamp, "stale": False}
+        self._scan_cycle += 1
+        if self.taxels is not None:
+            self.taxels.commit()
 
+        # 整个扫描周期完成后一次性发布，本周期未读取的传感器沿用上一帧数据
+        self._publish(forces)
         return forces
 
+    def _publish(self, forces):
+        self._state.publish(MappingProxyType(forces))
+        if self.on_publish is not None:
+            self.on_publish(self)
+
+
+class SensorCommunication:
+    """
+    触觉传感器采集：管理一个或多个控制盒
+
+    每个控制盒（TouchBoxLink）有自己的串口、扫描线程和 端口 -> 传感器 映射，
+    任一控制盒完成一个扫描周期后，把所有控制盒的最新数据合并成一帧带时间戳的快照发布。
+    传感器分布在多个控制盒上时，各串口并行扫描，整体扫描频率随控制盒数量近似线性提高。
+    """
+
+    FORCE_MAP = TouchBoxLink.FORCE_MAP
+
+    def __init__(self, port: str = None, baudrate: int = 460800, timeout: float = 0.2,
+                 request_lengths=(3,), scan_interval: float = 0.02, boxes: List[Dict[str, Any]] = None,
+                 taxel_shape=None):
+        """
+        参数:
+            port / baudrate / timeout / request_lengths / scan_interval: 同 TouchBoxLink，
+                未给出 boxes 时使用单个控制盒和默认 FORCE_MAP
+            boxes: 多控制盒配置，如
+                [{"port": "/dev/ttyACM0", "force_map": {1: (1, True), 2: (3, False)}},
+                 {"port": "/dev/ttyACM1", "force_map": {3: (5, True), 4: (6, False)}}]
+                每项可单独指定 "baudrate"、"taxel_shape"，各控制盒的传感器编号不能重复
+            taxel_shape: 分布力触点阵列形状 (行, 列)，None 为只读合力
+        """
+        if boxes is None:
+            boxes = [{"port": port}]
+        # 合并后的力数据快照：data 为所有控制盒的 {传感器编号: {...}}
+        self._state = SnapshotPublisher(MappingProxyType({}))
+        self._merge_lock = threading.Lock()
+        self.boxes = []
+        self._owner = {}
+        for k, config in enumerate(boxes):
+            name = "touch" if len(boxes) == 1 else f"touch{k + 1}"
+            box = TouchBoxLink(config.get("port"), config.get("baudrate", baudrate), timeout, request_lengths,
+                               scan_interval, force_map=config.get("force_map"), name=name,
+                               on_publish=self._merge, taxel_shape=config.get("taxel_shape", taxel_shape))
+            for sensor_id in box.force_map:
+                if sensor_id in self._owner:
+                    raise ValueError(f"传感器 {sensor_id} 同时配置在 {self._owner[sensor_id].name} 和 {name}")
+                self._owner[sensor_id] = box
+            self.boxes.append(box)
+        self.force_map = {i: box.force_map[i] for i, box in self._owner.items()}
+
+    def _merge(self, box=None):
+        """某个控制盒发布新数据后，合并所有控制盒的最新数据发布一帧"""
+        with self._merge_lock:
+            merged = {}
+            for b in self.boxes:
+                merged.update(b.get_snapshot().data)
+            self._state.publish(MappingProxyType(merged))
+
+    @property
+    def force_data(self):
+        """最新一帧合并后的力数据（只读），兼容旧版 self.force_data"""
+        return self._state.current.data
+
+    def get_snapshot(self) -> Snapshot:
+        """最新一帧合并后的力数据快照（seq, timestamp, data）"""
+        return self._state.current
+
+    def wait_for_frame(self, last_seq: int = 0, timeout: float = None) -> Optional[Snapshot]:
+        """阻塞等待序号大于 last_seq 的合并帧，超时返回 None"""
+        return self._state.wait_newer(last_seq, timeout)
+
+    @property
+    def connected(self) -> bool:
+        """所有控制盒都已连接"""
+        return all(box.link.connected for box in self.boxes)
+
+    def box_of(self, sensor_id: int) -> TouchBoxLink:
+        """传感器所在的控制盒"""
+        return self._owner[sensor_id]
+
+    # ---------------- 扫描调度 ----------------
+    def set_scan_rate(self, sensor_id: int, period: int = 1, priority: int = None):
+        if sensor_id not in self._owner:
+            logger.error(f"无效的传感器编号: {sensor_id}")
+            return
+        self._owner[sensor_id].set_scan_rate(sensor_id, period, priority)
+
+    def set_scan_profile(self, periods: Dict[int, int], priorities: Dict[int, int] = None):
+        """批量设置扫描频率和优先级，按传感器所在控制盒分别设置"""
+        priorities = priorities or {}
+        for sensor_id, period in periods.items():
+            self.set_scan_rate(sensor_id, period, priorities.get(sensor_id))
+
+    def reset_scan_profile(self):
+        for box in self.boxes:
+            box.reset_scan_profile()
+
+    # ---------------- 滤波 ----------------
+    def set_filter(self, sensor_id: int, kind: str = None, window: int = None, **params) -> bool:
+        if sensor_id not in self._owner:
+            logger.error(f"无效的传感器编号: {sensor_id}")
+            return False
+        return self._owner[sensor_id].set_filter(sensor_id, kind, window, **params)
+
+    def get_filter_config(self) -> Dict[int, Dict[str, Any]]:
+        config = {}
+        for box in self.boxes:
+            config.update(box.filters.get_config())
+        return config
+
+    # ---------------- 统计 ----------------
+    def get_sample_rates(self) -> Dict[int, float]:
+        rates = {}
+        for box in self.boxes:
+            rates.update(box.get_sample_rates())
+        return rates
+
+    def get_port_health(self) -> Dict[int, Dict[str, Any]]:
+        health = {}
+        for box in self.boxes:
+            for sensor_id, state in box.get_port_health().items():
+                state["box"] = box.name
+                health[sensor_id] = state
+        return health
+
+    # ---------------- 分布力 ----------------
+    def get_taxels(self, sensor_ids=None) -> Dict[int, Dict[str, Any]]:
+        """
+        各传感器最新一帧分布力数据（数组拷贝）
+
+        返回:
+            {传感器编号: {"timestamp": 采样时刻, "data": ndarray[行, 列]}}，未开启分布力的控制盒不在其中
+        """
+        result = {}
+        for box in self.boxes:
+            if box.taxels is None:
+                continue
+            seq, stamps, frames = box.taxels.latest_frame()
+            if not seq:
+                continue
+            for sensor_id, k in box.taxels.index.items():
+                if sensor_ids is None or sensor_id in sensor_ids:
+                    result[sensor_id] = {"timestamp": stamps[k], "data": frames[k]}
+        return result
+
+    def get_taxel_history(self, sensor_id: int, n: int = None):
+        """单个传感器最近 n 帧分布力数据 (采样时刻 [帧], 触点数据 [帧, 行, 列])，未开启时返回 None"""
+        box = self._owner[sensor_id]
+        if box.taxels is None:
+            return None
+        stamps, frames = box.taxels.history(n)
+        k = box.taxels.index[sensor_id]
+        return stamps[:, k], frames[:, k]
+
+    def get_link_stats(self) -> Dict[str, Dict[str, Any]]:
+        """{控制盒名称: 链路状态和重连统计}"""
+        stats = {}
+        for box in self.boxes:
+            stats[box.name] = box.link.get_stats()
+            stats[box.name]["port"] = box.port
+        return stats
+
+    def sensor_error(self, sensor_id: int):
+        return self._owner[sensor_id].sensor_error(sensor_id)
+
+    def oldest_sample(self, sensor_ids=None):
+        return _oldest_sample(self._state.current.data, self.force_map if sensor_ids is None else sensor_ids)
+
+    def get_sensor_ages(self, now=None):
+        now = time.monotonic() if now is None else now
+        return _sample_ages(self._state.current.data, self.force_map, now)
+
+    # ---------------- 线程 ----------------
+    def start_thread(self):
+        for box in self.boxes:
+            box.start_thread()
+
+    def stop_thread(self):
+        for box in self.boxes:
+            box.stop_thread()
+
+    def disconnect(self):
+        for box in self.boxes:
+            box.disconnect()
+
 if __name__ == "__main__":
     sensor = SensorCommunication()
     time.sleep(1)
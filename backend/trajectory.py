@@ -0,0 +1,213 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class Trajectory:
+    """
+    多关节时间参数化轨迹
+
+    waypoints 为 [(t, {id: 位置}), ...]，t 为相对起点的秒数且递增；
+    某个路点没有给出的关节沿用其上一个路点的位置。
+    smooth=True 时每段内按五次多项式（最小加加速度）插值，路点处速度为零；
+    否则按时间线性插值。
+    """
+
+    def __init__(self, waypoints, smooth=True):
+        if not waypoints:
+            raise ValueError("轨迹至少需要一个路点")
+        waypoints = sorted(waypoints, key=lambda w: w[0])
+        self.ids = sorted({i for _, pose in waypoints for i in pose})
+        self.times = np.array([t for t, _ in waypoints], dtype=float)
+        if np.any(np.diff(self.times) <= 0):
+            raise ValueError("路点时间必须严格递增")
+        # 位置矩阵：行为路点，列为关节
+        table = np.empty((len(waypoints), len(self.ids)))
+        last = {}
+        for row, (_, pose) in enumerate(waypoints):
+            for col, id_addr in enumerate(self.ids):
+                if id_addr in pose:
+                    last[id_addr] = pose[id_addr]
+                if id_addr not in last:
+                    raise ValueError("关节 {} 在第一个路点缺少位置".format(id_addr))
+                table[row, col] = last[id_addr]
+        self.points = table
+        self.smooth = smooth
+
+    @property
+    def duration(self) -> float:
+        return float(self.times[-1])
+
+    @classmethod
+    def from_current(cls, actuator, waypoints, smooth=True):
+        """以关节当前实际位置作为 t=0 的起点，后接 waypoints；有关节尚无实际位置时抛出 ValueError"""
+        ids = {i for _, pose in waypoints for i in pose}
+        positions = actuator.positions
+        start = {i: positions.get(i) for i in ids}
+        missing = sorted(i for i, pos in start.items() if pos is None)
+        if missing:
+            raise ValueError(f"关节 {missing} 尚无实际位置（未轮询到或离线），无法规划轨迹")
+        return cls([(0.0, start)] + [(t, pose) for t, pose in waypoints if t > 0], smooth)
+
+    def sample(self, t: float):
+        """t 时刻各关节的插值位置 {id: 位置}"""
+        times = self.times
+        if t <= times[0]:
+            row = self.points[0]
+        elif t >= times[-1]:
+            row = self.points[-1]
+        else:
+            k = int(np.searchsorted(times, t, side="right")) - 1
+            tau = (t - times[k]) / (times[k + 1] - times[k])
+            if self.smooth:
+                tau = tau * tau * tau * (10 - 15 * tau + 6 * tau * tau)
+            row = self.points[k] + (self.points[k + 1] - self.points[k]) * tau
+        return {id_addr: int(round(value)) for id_addr, value in zip(self.ids, row)}
+
+
+class TrajectoryExecutor:
+    """
+    轨迹流式执行器
+
+    在独立线程中按固定频率（绝对截止时间）采样当前轨迹，切换到伺服模式后
+    每个周期用一次批量写把所有关节的插值位置下发到总线，
+    同时统计截止时间错过次数和每周期唤醒抖动。
+    """
+
+    SERVO_MODE = 1          # 控制模式：1-伺服（跟随位置寄存器）
+    POSITION_REGISTER = 0x29
+
+    def __init__(self, actuator, rate=100.0, jitter_window=1000):
+        """
+        参数:
+            actuator: ServoActuator
+            rate: 下发频率（Hz），建议 100~200
+            jitter_window: 抖动统计保留的最近周期数
+        """
+        self.actuator = actuator
+        self.period = 1.0 / rate
+        self._running = threading.Event()
+        self._thread = None
+        self._cond = threading.Condition()
+        self._trajectory = None
+        self._start_time = None
+        self._finished = threading.Event()
+        self._finished.set()
+        self._jitter = deque(maxlen=jitter_window)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {"trajectories": 0, "cycles": 0, "deadline_misses": 0, "skipped_cycles": 0,
+                      "write_failures": 0, "max_jitter": 0.0, "max_exec": 0.0}
+        self._jitter.clear()
+
+    # ---------------- 轨迹控制 ----------------
+    def execute(self, trajectory: Trajectory, wait=False, timeout=None):
+        """
+        开始执行轨迹（替换正在执行的轨迹）
+
+        参数:
+            wait: True 时阻塞到轨迹执行完
+        返回:
+            wait=True 时是否在 timeout 内执行完，否则为 True
+        """
+        for id_addr in trajectory.ids:
+            self.actuator.set_mode(self.SERVO_MODE, id_addr)
+        with self._cond:
+            self._trajectory = trajectory
+            self._start_time = None
+            self._finished.clear()
+            self.stats["trajectories"] += 1
+            self._cond.notify()
+        if wait:
+            return self._finished.wait(timeout)
+        return True
+
+    def cancel(self):
+        """停止当前轨迹，关节保持在最后一次下发的位置"""
+        with self._cond:
+            self._trajectory = None
+            self._finished.set()
+
+    def wait(self, timeout=None) -> bool:
+        return self._finished.wait(timeout)
+
+    @property
+    def busy(self) -> bool:
+        return not self._finished.is_set()
+
+    # ---------------- 执行线程 ----------------
+    def run(self):
+        next_tick = None
+        while self._running.is_set():
+            with self._cond:
+                if self._trajectory is None:
+                    next_tick = None
+                    self._cond.wait(0.1)
+                    continue
+                trajectory = self._trajectory
+                if self._start_time is None:
+                    self._start_time = next_tick = time.monotonic()
+
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            wake = time.monotonic()
+            self._record_jitter(wake - next_tick)
+
+            t = wake - self._start_time
+            targets = trajectory.sample(t)
+            replies = self.actuator.write_registers_batch(
+                self.POSITION_REGISTER, {i: [pos] for i, pos in targets.items()})
+            self.stats["write_failures"] += len(targets) - len(replies)
+            self.stats["cycles"] += 1
+
+            done = time.monotonic()
+            self.stats["max_exec"] = max(self.stats["max_exec"], done - wake)
+            next_tick += self.period
+            if done > next_tick:
+                # 本周期执行超过了下一个截止时间：记一次错过，并跳过已过去的周期
+                self.stats["deadline_misses"] += 1
+                missed = int((done - next_tick) // self.period) + 1
+                self.stats["skipped_cycles"] += missed
+                next_tick += missed * self.period
+
+            if t >= trajectory.duration:
+                with self._cond:
+                    if self._trajectory is trajectory:
+                        self._trajectory = None
+                        self._finished.set()
+
+    def _record_jitter(self, jitter):
+        self._jitter.append(jitter)
+        self.stats["max_jitter"] = max(self.stats["max_jitter"], jitter)
+
+    def get_stats(self):
+        """周期数、截止时间错过次数、写失败次数和唤醒抖动（毫秒）"""
+        result = dict(self.stats)
+        result["period_ms"] = round(self.period * 1000, 3)
+        result["max_jitter"] = round(self.stats["max_jitter"] * 1000, 3)
+        result["max_exec"] = round(self.stats["max_exec"] * 1000, 3)
+        if self._jitter:
+            jitter = np.array(self._jitter) * 1000
+            result["jitter_ms"] = {
+                "mean": round(float(jitter.mean()), 3),
+                "p50": round(float(np.percentile(jitter, 50)), 3),
+                "p99": round(float(np.percentile(jitter, 99)), 3),
+            }
+        return result
+
+    def start_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._running.set()
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+
+    def stop_thread(self):
+        self.cancel()
+        self._running.clear()
+        if self._thread:
+            self._thread.join()
+        self._thread = None
@@ -0,0 +1,99 @@
+import threading
+import time
+
+
+class StalenessWatchdog:
+    """
+    数据新鲜度看门狗
+
+    每个数据流登记一个返回"最旧采样时刻"（time.monotonic()）的函数和允许的最大数据年龄；
+    任一关键数据流超龄时 check() 返回超龄列表，调用方据此保持执行器目标不变，
+    数据恢复后自动解除。同时统计超龄次数和累计保持时间，供界面显示。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.streams = {}
+        self.holding = False
+        self.hold_count = 0
+        self.hold_time = 0.0
+        self._hold_since = None
+        self.last_stale = []
+
+    def add_stream(self, name: str, oldest_sample, max_age: float, critical: bool = True):
+        """
+        参数:
+            name: 数据流名称
+            oldest_sample: 无参函数，返回该数据流中最旧采样的时刻，从未采样（或没有可用数据）返回 None
+            max_age: 允许的最大数据年龄（秒）
+            critical: 超龄时是否要求保持执行器目标
+        """
+        self.streams[name] = {"oldest_sample": oldest_sample, "max_age": max_age,
+                              "critical": critical, "stale_count": 0, "max_seen": 0.0, "stale": False}
+
+    def ages(self, now: float = None):
+        """{数据流: 数据年龄（秒）}，从未采样的为 None"""
+        now = time.monotonic() if now is None else now
+        result = {}
+        for name, stream in self.streams.items():
+            stamp = stream["oldest_sample"]()
+            result[name] = None if stamp is None else now - stamp
+        return result
+
+    def check(self, now: float = None):
+        """
+        检查所有数据流，更新统计
+
+        返回:
+            超龄的关键数据流名称列表（为空表示可以下发新目标）
+        """
+        now = time.monotonic() if now is None else now
+        stale = []
+        with self._lock:
+            for name, age in self.ages(now).items():
+                stream = self.streams[name]
+                if age is None:
+                    # 从未采样：关键数据流视为超龄；非关键数据流没有可用数据，不计超龄
+                    is_stale = stream["critical"]
+                else:
+                    is_stale = age > stream["max_age"]
+                if age is not None:
+                    stream["max_seen"] = max(stream["max_seen"], age)
+                if is_stale and not stream["stale"]:
+                    stream["stale_count"] += 1
+                stream["stale"] = is_stale
+                if is_stale and stream["critical"]:
+                    stale.append(name)
+            if stale and not self.holding:
+                self.holding = True
+                self.hold_count += 1
+                self._hold_since = now
+            elif not stale and self.holding:
+                self.holding = False
+                self.hold_time += now - self._hold_since
+                self._hold_since = None
+            self.last_stale = stale
+        return stale
+
+    def report(self, now: float = None):
+        """各数据流年龄和超龄统计（毫秒），以及当前是否处于保持状态"""
+        now = time.monotonic() if now is None else now
+        ages = self.ages(now)
+        with self._lock:
+            hold_time = self.hold_time + (now - self._hold_since if self.holding else 0.0)
+            return {
+                "holding": self.holding,
+                "stale": list(self.last_stale),
+                "hold_count": self.hold_count,
+                "hold_time_ms": round(hold_time * 1000, 1),
+                "streams": {
+                    name: {
+                        "age_ms": None if ages[name] is None else round(ages[name] * 1000, 1),
+                        "max_age_ms": round(stream["max_age"] * 1000, 1),
+                        "max_seen_ms": round(stream["max_seen"] * 1000, 1),
+                        "stale_count": stream["stale_count"],
+                        "critical": stream["critical"],
+                    }
+                    for name, stream in self.streams.items()
+                },
+            }